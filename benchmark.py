@@ -0,0 +1,288 @@
+"""
+핫패스 마이크로벤치마크
+
+    python benchmark.py                     # 전체 실행 후 이전 기록과 비교
+    python benchmark.py --filter heatmap    # 이름에 heatmap이 들어간 항목만 실행
+    python benchmark.py --threshold 0.3     # 30% 이상 느려지면 실패
+    python benchmark.py --accept            # 의도한 성능 변화라서 느려져도 기록
+
+항목마다 timeit으로 한 번에 0.2초 이상 걸리도록 여러 번 실행한 것을 한 샘플로 재고, 샘플 중 최소값으로 비교합니다.
+최근 BASELINE_RUNS 번 기록의 항목별 최소값의 중앙값을 기준으로, threshold 비율 이상이면서
+MIN_REGRESSION 초 이상 느려진 항목이 있으면 종료 코드 1로 끝납니다.
+회귀가 없는 실행만 커밋 해시와 함께 benchmark_history.jsonl 에 한 줄씩 추가되므로
+느린 실행이 기준이 되거나, 커밋마다 조금씩 느려지는 것을 놓치지 않습니다.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import statistics
+import subprocess
+import sys
+import timeit
+from datetime import datetime, timedelta
+from unittest import mock
+
+import matplotlib
+matplotlib.use("Agg")
+
+import aiohttp  # noqa: E402
+import bot  # noqa: E402
+import main  # noqa: E402
+import stats  # noqa: E402
+from cache import MemoryCache  # noqa: E402
+from rate_limiter import RateLimiter  # noqa: E402
+
+HISTORY_FILE = "benchmark_history.jsonl"
+DEFAULT_THRESHOLD = 0.2
+# 기준값을 계산할 최근 기록 수
+BASELINE_RUNS = 5
+# 이 시간(초)보다 적게 느려지면 비율과 상관없이 회귀로 보지 않음 (수십 µs 함수의 측정 잡음)
+MIN_REGRESSION = 0.00005
+
+# 가짜 API 응답 지연 시간 (초)
+MOCK_LATENCY = 0.02
+
+
+def make_history(days: int, levelup: bool) -> list:
+    """
+    날짜 내림차순 경험치 히스토리 생성 (levelup이면 매일 레벨업)
+    """
+    today = datetime(2024, 3, 31)
+    history = []
+    for i in range(days):
+        day = days - 1 - i
+        if levelup:
+            level, exp_rate = 200 + day, 50.0
+        else:
+            level, exp_rate = 250, day * 100 / days
+        history.append({
+            'date': (today - timedelta(days=i)).strftime("%Y-%m-%d"),
+            'exp': 0,
+            'level': level,
+            'exp_rate': exp_rate
+        })
+    return history
+
+
+class _MockResponse:
+    def __init__(self, url: str):
+        self.status = 200
+        self.url = url
+
+    async def __aenter__(self):
+        await asyncio.sleep(MOCK_LATENCY)
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def text(self):
+        return json.dumps({
+            'ocid': 'benchmark',
+            'character_exp': 123456789,
+            'character_level': 250,
+            'character_exp_rate': '12.345'
+        })
+
+
+class _MockSession:
+    """
+    aiohttp.ClientSession 대신 쓰는 가짜 세션 (요청마다 MOCK_LATENCY 만큼 지연)
+    """
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def get(self, url, **kwargs):
+        return _MockResponse(url)
+
+
+def _run_with_mock_transport(coro_factory, warm_cache: bool = False):
+    """
+    가짜 세션으로 coro_factory를 실행하는 함수 (warm_cache가 아니면 매번 빈 캐시로 시작)
+
+    조회 경로 자체를 측정하도록 초당 호출 수 제한은 끄고,
+    가짜 캐릭터가 공유 통계 저장소(CACHE_PATH)에 남지 않도록 통계 엔진도 메모리용으로 바꿉니다.
+    """
+    warm = MemoryCache()
+
+    def run():
+        with mock.patch.object(aiohttp, "ClientSession", _MockSession), \
+                mock.patch.object(main, "cache", warm if warm_cache else MemoryCache()), \
+                mock.patch.object(main, "api_rate_limiter", RateLimiter("benchmark", rate=0)), \
+                mock.patch.object(main, "stats_engine", stats.StatsEngine(MemoryCache())):
+            asyncio.run(coro_factory())
+    return run
+
+
+def _benchmarks() -> dict:
+    """
+    {이름: 인자 없는 함수} 형태의 벤치마크 목록
+    """
+    cases = {}
+
+    for days in (7, 14, 31):
+        history = sorted(make_history(days, levelup=False), key=lambda x: x['date'])
+        cases[f"create_exp_graph[{days}]"] = (
+            lambda history=history: bot.create_exp_graph(history, "벤치마크"))
+
+    for days in (7, 15, 31):
+        gains = stats.calculate_daily_gains(make_history(days + 1, levelup=days % 2 == 1))
+        cases[f"create_monthly_heatmap[{days}]"] = (
+            lambda gains=gains: bot.create_monthly_heatmap(gains, "벤치마크", 2024, 3))
+
+    for levelup in (False, True):
+        history = make_history(31, levelup=levelup)
+        name = "levelup" if levelup else "same_level"
+        cases[f"calculate_daily_gains[{name}]"] = (
+            lambda history=history: stats.calculate_daily_gains(history))
+
+    # 통계 엔진: 1년치 기록에 스냅샷 하나 반영 (새 날짜 / 오늘 스냅샷 변경) / 미리 계산된 통계 읽기
+    # 같은 값을 다시 넣으면 아무것도 하지 않으므로 실행할 때마다 새 스냅샷을 만듦
+    year_history = make_history(365, levelup=False)
+    latest = datetime.strptime(year_history[0]['date'], "%Y-%m-%d")
+
+    append_engine = stats.StatsEngine(MemoryCache())
+    append_engine.record_snapshots("benchmark", year_history)
+    next_days = itertools.count(1)
+
+    def append_snapshot():
+        day = next(next_days)
+        append_engine.record_snapshots("benchmark", [{
+            'date': (latest + timedelta(days=day)).strftime("%Y-%m-%d"),
+            'exp': 0, 'level': 250 + day // 100, 'exp_rate': day % 100 * 0.9
+        }])
+
+    engine = stats.StatsEngine(MemoryCache())
+    engine.record_snapshots("benchmark", year_history)
+    next_rates = itertools.count(1)
+
+    def replace_snapshot():
+        engine.record_snapshots("benchmark", [dict(
+            year_history[0], exp_rate=year_history[0]['exp_rate'] + next(next_rates) % 1000 * 0.001)])
+
+    cases["stats_engine.record_snapshots[append]"] = append_snapshot
+    cases["stats_engine.record_snapshots[replace_latest]"] = replace_snapshot
+    cases["stats_engine.summary"] = lambda: engine.summary("benchmark")
+    cases["stats_engine.gains_for_month"] = lambda: engine.gains_for_month("benchmark", 2024, 3)
+
+    cases["get_character_exp_history[mock]"] = _run_with_mock_transport(
+        lambda: main.get_character_exp_history("benchmark"))
+    cases["get_character_exp_monthly[mock]"] = _run_with_mock_transport(
+        lambda: main.get_character_exp_monthly("benchmark", 2024, 3))
+    cases["get_character_exp_monthly[cached]"] = _run_with_mock_transport(
+        lambda: main.get_character_exp_monthly("benchmark", 2024, 3), warm_cache=True)
+
+    return cases
+
+
+def measure(func, repeat: int) -> dict:
+    """
+    func 한 번 실행 시간(초)의 중앙값/최소값
+
+    timeit autorange로 샘플 하나가 0.2초 이상 걸리는 실행 횟수를 정하고 (폰트 캐시 등 첫 실행 비용도 여기서 제외),
+    repeat 개 샘플을 실행 횟수로 나눠 씁니다.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    timings = [total / number for total in timer.repeat(repeat, number)]
+    return {'median': statistics.median(timings), 'min': min(timings), 'repeat': repeat, 'number': number}
+
+
+def current_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def load_baseline(path: str, runs: int = BASELINE_RUNS):
+    """
+    기록 파일의 최근 runs 번 결과에서 항목별 최소값의 중앙값 (기록이 없으면 None)
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            lines = [line for line in f if line.strip()]
+    except FileNotFoundError:
+        return None
+    records = [json.loads(line) for line in lines[-runs:]]
+    if not records:
+        return None
+
+    minimums = {}
+    for record in records:
+        for name, result in record.get('results', {}).items():
+            minimums.setdefault(name, []).append(result['min'])
+    return {
+        'commits': [record.get('commit') for record in records],
+        'results': {name: {'min': statistics.median(values)} for name, values in minimums.items()}
+    }
+
+
+def find_regressions(baseline: dict, results: dict, threshold: float) -> list:
+    """
+    기준값보다 최소값이 threshold 비율 이상, MIN_REGRESSION 초 이상 느려진 항목 목록
+    """
+    regressions = []
+    for name, result in results.items():
+        before = baseline['results'].get(name)
+        if before is None:
+            continue
+        after = result['min']
+        if after > before['min'] * (1 + threshold) and after - before['min'] > MIN_REGRESSION:
+            regressions.append((name, before['min'], after))
+    return regressions
+
+
+def main_cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="핫패스 마이크로벤치마크")
+    parser.add_argument("--filter", default="", help="이름에 이 문자열이 들어간 항목만 실행")
+    parser.add_argument("--repeat", type=int, default=5, help="항목별 샘플 수")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="이 비율 이상 느려지면 회귀로 판단 (기본 0.2 = 20%%)")
+    parser.add_argument("--output", default=HISTORY_FILE, help="결과 기록 파일 (JSON lines)")
+    parser.add_argument("--no-save", action="store_true", help="결과를 기록 파일에 추가하지 않음")
+    parser.add_argument("--accept", action="store_true",
+                        help="느려진 항목이 있어도 결과를 기록 (의도한 변경일 때)")
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.output)
+
+    results = {}
+    for name, func in _benchmarks().items():
+        if args.filter not in name:
+            continue
+        results[name] = measure(func, args.repeat)
+        print(f"{name:46s} 중앙값 {results[name]['median'] * 1000:9.3f}ms"
+              f"  최소 {results[name]['min'] * 1000:9.3f}ms  ({results[name]['number']}회 x {args.repeat})")
+
+    record = {
+        'commit': current_commit(),
+        'timestamp': datetime.now().isoformat(timespec="seconds"),
+        'python': sys.version.split()[0],
+        'results': results
+    }
+    regressions = find_regressions(baseline, results, args.threshold) if baseline else []
+    for name, before, after in regressions:
+        print(f"⚠️ 성능 저하: {name} {before * 1000:.2f}ms → {after * 1000:.2f}ms "
+              f"(기준 커밋 {', '.join(baseline['commits'])})")
+
+    failed = bool(regressions) and not args.accept
+    if failed:
+        print("성능 저하가 있어 결과를 기록하지 않았습니다. 의도한 변경이면 --accept로 다시 실행하세요.")
+    elif not args.no_save:
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -1,19 +1,158 @@
 import discord
 from discord.ext import commands
+from discord import app_commands
 import matplotlib.pyplot as plt
 from datetime import datetime, time, timedelta
 import io
 from config import DISCORD_BOT_TOKEN
-from main import get_character_ocid, get_character_info, get_character_exp_history, get_character_exp_monthly, MapleAPIError
+from main import get_character_ocid, get_character_info, iter_character_exp_history, iter_character_exp_monthly, is_degraded, MapleAPIError
+from progress import get_response
+from cache import image_cache
+from stats import calculate_daily_gains, engine as stats_engine
+from scheduler import JobScheduler, SchedulerFullError, DuplicateJobError, PRIORITY_CHEAP, PRIORITY_NORMAL, PRIORITY_HEAVY
 import matplotlib.font_manager as fm
 from discord.ext import tasks
-import aiohttp
+import asyncio
+import functools
+import hashlib
+import json
+import os
+import metrics
+import profiler
+import transport
 from bs4 import BeautifulSoup
 import pytz  # 시간대 처리를 위한 모듈 추가
+import traceback
 
 intents = discord.Intents.default()
 intents.message_content = True
-bot = commands.Bot(command_prefix="!", intents=intents)
+
+# 여러 프로세스로 나눠 실행할 때 (supervisor.py가 설정) 이 프로세스가 맡을 샤드
+SHARD_ID = os.getenv("SHARD_ID")
+SHARD_COUNT = os.getenv("SHARD_COUNT")
+if SHARD_ID is not None and SHARD_COUNT is not None:
+    bot = commands.Bot(command_prefix="!", intents=intents,
+                       shard_id=int(SHARD_ID), shard_count=int(SHARD_COUNT))
+else:
+    bot = commands.Bot(command_prefix="!", intents=intents)
+
+# 무거운 명령어(조회 + 그래프 생성) 동시 실행 제한
+scheduler = JobScheduler(
+    max_workers=int(os.getenv("JOB_WORKERS", "3")),
+    max_pending=int(os.getenv("JOB_QUEUE_SIZE", "20"))
+)
+
+
+def scheduled(priority: int):
+    """
+    명령어를 작업 스케줄러를 통해 실행하도록 하는 데코레이터
+
+    대기열이 가득 차면 바로 거절하고, 대기해야 하면 대기 순서를 알려줍니다.
+    같은 사용자가 같은 명령어를 같은 인자로 다시 보내면 중복 실행하지 않습니다.
+    슬래시 명령어는 대기 중에 응답 시간(3초)이 지나지 않도록 가장 먼저 defer 합니다.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(ctx, *args, **kwargs):
+            response = get_response(ctx)
+            await response.defer()
+
+            key = (func.__name__, ctx.author.id, args, tuple(sorted(kwargs.items())))
+            guild_id = ctx.guild.id if ctx.guild else None
+
+            async def run():
+                with profiler.profile(func.__name__):
+                    await func(ctx, *args, **kwargs)
+
+            try:
+                job = scheduler.submit(key, run,
+                                       priority=priority, user_id=ctx.author.id, guild_id=guild_id)
+            except DuplicateJobError as e:
+                metrics.inc("commands_rejected_total", command=func.__name__, reason="duplicate")
+                if e.position:
+                    await response.finish(content=f"⏳ 같은 요청이 이미 대기열 {e.position}번째에 있습니다.")
+                else:
+                    await response.finish(content="⏳ 같은 요청을 이미 처리하고 있습니다.")
+                return
+            except SchedulerFullError:
+                metrics.inc("commands_rejected_total", command=func.__name__, reason="busy")
+                await response.finish(content="🚫 요청이 너무 많습니다. 잠시 후 다시 시도해주세요.")
+                return
+
+            metrics.inc("commands_total", command=func.__name__)
+            _record_queue_stats()
+            try:
+                with metrics.timer("command_seconds", command=func.__name__):
+                    position = scheduler.position(job)
+                    if position:
+                        metrics.inc("commands_queued_total", command=func.__name__)
+                        await response.update(f"⏳ 요청이 많아 대기열 {position}번째에 등록되었습니다.", force=True)
+                    await job.future
+            finally:
+                _record_queue_stats()
+        return wrapper
+    return decorator
+
+
+def _record_queue_stats():
+    for name, value in scheduler.stats().items():
+        metrics.set_gauge(f"job_queue_{name}", value)
+
+
+# 넥슨 API 장애로 저장된 데이터를 보여줄 때 임베드에 붙이는 안내
+STALE_NOTICE = "⚠️ 넥슨 API 장애로 저장된 데이터를 표시합니다. 최신 정보가 아닐 수 있습니다."
+# 장애로 일부 날짜를 조회하지 못했을 때 붙이는 안내
+MISSING_NOTICE = "⚠️ 넥슨 API 장애로 {missing}일의 데이터를 불러오지 못했습니다. 빈 날짜가 실제 기록과 다를 수 있습니다."
+
+
+def mark_stale(embed, *sources, missing: int = 0):
+    """
+    조회 결과 중 오래된 데이터가 있거나 장애로 건너뛴 날짜가 있으면 임베드 설명에 안내 문구 추가
+    """
+    notices = []
+    if any(source.get('stale') for source in sources):
+        notices.append(STALE_NOTICE)
+    if missing:
+        notices.append(MISSING_NOTICE.format(missing=missing))
+    if notices:
+        embed.description = "\n".join(notices)
+
+
+def render_cached(render, *args):
+    """
+    같은 입력으로 그린 이미지가 있으면 다시 그리지 않고 재사용 (CACHE_PATH 설정 시 샤드 간 공유)
+    """
+    key = hashlib.sha1(json.dumps([render.__name__, args], sort_keys=True, ensure_ascii=False,
+                                  default=str).encode()).hexdigest()
+    png = image_cache.get("image", key)
+    if png is None:
+        png = render(*args).getvalue()
+        image_cache.set("image", key, png)
+    return io.BytesIO(png)
+
+
+def add_stats_fields(embed, ocid: str):
+    """
+    통계 엔진에 미리 계산된 최근 경험치 통계를 임베드에 추가
+    """
+    summary = stats_engine.summary(ocid)
+    if summary is None:
+        return
+
+    embed.add_field(name="최근 7일 획득", value=f"+{summary['sum_7']:.2f}% (일평균 {summary['avg_7']:.2f}%)", inline=True)
+    embed.add_field(name="최근 30일 획득", value=f"+{summary['sum_30']:.2f}%", inline=True)
+    embed.add_field(name="연속 성장", value=f"{summary['streak']}일 (최고 {summary['best_streak']}일)", inline=True)
+    if summary['best_date']:
+        embed.add_field(name="최고 기록", value=f"{summary['best_date']} +{summary['best_gain']:.2f}%", inline=True)
+    if summary['levelup_dates']:
+        embed.add_field(name="최근 레벨업", value=summary['levelup_dates'][-1], inline=True)
+
+
+def stage(command: str, name: str):
+    """
+    명령어 처리 단계(ocid 조회, 히스토리 조회, 렌더링, 업로드)별 실행 시간 기록
+    """
+    return metrics.timer("command_stage_seconds", command=command, stage=name)
 
 
 @bot.event
@@ -114,23 +253,33 @@ def create_exp_graph(exp_history: list, character_name: str):
         return buf
 
 
-@bot.command()
+@bot.hybrid_command()
+@app_commands.describe(character_name="캐릭터 이름")
+@scheduled(PRIORITY_NORMAL)
 async def 주간(ctx, character_name: str):
     """
     캐릭터의 정보와 경험치 그래프를 조회합니다
     """
+    response = get_response(ctx)
     try:
-        loading_msg = await ctx.send("캐릭터 정보를 조회중입니다...")
+        await response.start("캐릭터 정보를 조회중입니다...")
 
         # OCID 조회
-        ocid = await get_character_ocid(character_name)
+        with stage("주간", "ocid"):
+            ocid = await get_character_ocid(character_name)
         if not ocid:
-            await loading_msg.edit(content="캐릭터를 찾을 수 없습니다.")
+            await response.finish(content="캐릭터를 찾을 수 없습니다.")
             return
 
-        # 캐릭터 정보와 경험치 히스토리 동시 조회
-        info = await get_character_info(ocid)
-        exp_history = await get_character_exp_history(ocid)
+        # 캐릭터 정보를 먼저 조회 (오늘 스냅샷과 같은 요청이므로 히스토리 조회는 캐시된 응답을 씀)
+        with stage("주간", "fetch"):
+            info = await get_character_info(ocid)
+            exp_history = []
+            missing = 0
+            async for _, _, snapshot, missing in iter_character_exp_history(ocid):
+                if snapshot is not None:
+                    exp_history.append(snapshot)
+            exp_history.sort(key=lambda x: x['date'])
 
         # 캐릭터 이미지 URL 설정
         character_image = info.get('character_image', '')
@@ -174,40 +323,49 @@ async def 주간(ctx, character_name: str):
         create_date = info.get('character_date_create', '').split('T')[0]
         if create_date:
             embed.set_footer(text=f"캐릭터 생성일: {create_date}")
+        mark_stale(embed, info, *exp_history, missing=missing)
+        add_stats_fields(embed, ocid)
 
         # 경험치 그래프 생성
         if exp_history:
-            graph_buf = create_exp_graph(exp_history, character_name)
+            with stage("주간", "render"):
+                graph_buf = render_cached(create_exp_graph, exp_history, character_name)
             file = discord.File(graph_buf, filename="exp_graph.png")
             embed.set_image(url="attachment://exp_graph.png")
-            await loading_msg.delete()
-            await ctx.send(file=file, embed=embed)
+            with stage("주간", "upload"):
+                await response.finish(embed=embed, file=file)
         else:
-            await loading_msg.edit(content=None, embed=embed)
+            with stage("주간", "upload"):
+                await response.finish(embed=embed)
 
     except MapleAPIError as e:
-        await ctx.send(f"❌ 오류: {str(e)}")
+        await response.finish(content=f"❌ 오류: {str(e)}")
     except Exception as e:
-        await ctx.send("⚠️ 내부 오류가 발생했습니다")
+        await response.finish(content="⚠️ 내부 오류가 발생했습니다")
         print(f"Unexpected error: {str(e)}")
 
 
-@bot.command()
+@bot.hybrid_command()
+@app_commands.describe(character_name="캐릭터 이름")
+@scheduled(PRIORITY_CHEAP)
 async def info(ctx, character_name: str):
     """
     캐릭터의 기본 정보를 조회합니다
     """
+    response = get_response(ctx)
     try:
-        loading_msg = await ctx.send("캐릭터 정보를 조회중입니다...")
+        await response.start("캐릭터 정보를 조회중입니다...")
 
         # OCID 조회
-        ocid = await get_character_ocid(character_name)
+        with stage("info", "ocid"):
+            ocid = await get_character_ocid(character_name)
         if not ocid:
-            await loading_msg.edit(content="캐릭터를 찾을 수 없습니다.")
+            await response.finish(content="캐릭터를 찾을 수 없습니다.")
             return
 
         # 캐릭터 정보 조회
-        info = await get_character_info(ocid)
+        with stage("info", "fetch"):
+            info = await get_character_info(ocid)
 
         # 캐릭터 이미지 URL 설정
         character_image = info.get('character_image', '')
@@ -251,87 +409,121 @@ async def info(ctx, character_name: str):
         create_date = info.get('character_date_create', '').split('T')[0]
         if create_date:
             embed.set_footer(text=f"캐릭터 생성일: {create_date}")
+        mark_stale(embed, info)
+        add_stats_fields(embed, ocid)
 
         # 로딩 메시지를 결과로 교체
-        await loading_msg.edit(content=None, embed=embed)
+        with stage("info", "upload"):
+            await response.finish(embed=embed)
 
     except MapleAPIError as e:
-        await ctx.send(f"❌ 오류: {str(e)}")
+        await response.finish(content=f"❌ 오류: {str(e)}")
     except Exception as e:
-        await ctx.send("⚠️ 내부 오류가 발생했습니다")
+        await response.finish(content="⚠️ 내부 오류가 발생했습니다")
         print(f"Unexpected error: {str(e)}")
 
 
-@bot.command()
-async def 월간(ctx, character_name: str, *args):
+def format_monthly_progress(exp_history: list, year: int, month: int, completed: int, total: int) -> str:
+    """
+    월간 조회 중간 결과를 로딩 메시지 문자열로 만드는 함수
+    """
+    content = f"{year}년 {month}월 경험치 데이터를 조회중입니다... ({completed}/{total}일)"
+    if not exp_history:
+        return content
+
+    # 지금까지 도착한 날짜들 중 연속된 날짜끼리만 획득량 계산
+    received = sorted(exp_history, key=lambda x: x['date'], reverse=True)
+    received_dates = {history['date'] for history in received}
+    gains = []
+    for gain in calculate_daily_gains(received):
+        yesterday = datetime.strptime(gain['date'], '%Y-%m-%d') - timedelta(days=1)
+        if yesterday.strftime('%Y-%m-%d') in received_dates:
+            gains.append(gain)
+
+    latest = received[0]
+    content += f"\n최근 조회: {latest['date']} Lv.{latest['level']} ({latest['exp_rate']:.3f}%)"
+    if gains:
+        total_gain = sum(gain['exp_gain_rate'] for gain in gains)
+        levelups = sum(gain['level_diff'] for gain in gains)
+        content += f"\n지금까지 {len(gains)}일 획득량: +{total_gain:.2f}%"
+        if levelups:
+            content += f" (레벨업 {levelups}회)"
+    return content
+
+
+def report_command_error(ctx, error):
+    """
+    명령어별 오류 처리기가 처리하지 않은 오류 기록
+
+    명령어에 오류 처리기가 있으면 기본 on_command_error가 아무것도 하지 않으므로
+    처리하지 않은 오류는 여기서 남겨야 묻히지 않습니다.
+    """
+    original = getattr(error, 'original', error)
+    metrics.inc("command_errors_total", command=ctx.command.name if ctx.command else "unknown",
+                error=type(original).__name__)
+    print(f"명령어 '{ctx.command}' 오류: {original!r}")
+    traceback.print_exception(type(original), original, original.__traceback__)
+
+
+MONTHLY_USAGE = "❌ 올바른 연도와 월을 입력해주세요. (예: !월간 캐릭터명 2024 3)"
+
+
+@bot.hybrid_command()
+@app_commands.describe(character_name="캐릭터 이름", year="연도 (생략하면 이번 달)", month="월 (생략하면 이번 달)")
+@scheduled(PRIORITY_HEAVY)
+async def 월간(ctx, character_name: str, year: int = None, month: int = None):
     """
     캐릭터의 월간 경험치 획득량을 히트맵으로 보여줍니다
     """
+    response = get_response(ctx)
     try:
         now = datetime.now()
 
         # 날짜 파라미터 처리
-        if args:
-            try:
-                year = int(args[0])
-                month = int(args[1])
-                if not (1 <= month <= 12):
-                    raise ValueError
-            except (ValueError, IndexError):
-                await ctx.send("❌ 올바른 연도와 월을 입력해주세요. (예: !monthly 캐릭터명 2024 3)")
-                return
-        else:
+        if year is None and month is None:
             year = now.year
             month = now.month
+        elif year is None or month is None or not (1 <= month <= 12):
+            await response.finish(content=MONTHLY_USAGE)
+            return
 
-        loading_msg = await ctx.send(f"{year}년 {month}월 경험치 데이터를 조회중입니다...")
+        await response.start(f"{year}년 {month}월 경험치 데이터를 조회중입니다...")
 
         # OCID 조회
-        ocid = await get_character_ocid(character_name)
+        with stage("월간", "ocid"):
+            ocid = await get_character_ocid(character_name)
         if not ocid:
-            await loading_msg.edit(content="캐릭터를 찾을 수 없습니다.")
+            await response.finish(content="캐릭터를 찾을 수 없습니다.")
             return
 
-        # 월간 경험치 히스토리 조회
-        exp_history = await get_character_exp_monthly(ocid, year, month)
+        # 월간 경험치 히스토리 조회 (도착하는 대로 진행 상황 표시)
+        exp_history = []
+        missing = 0
+        with stage("월간", "fetch"):
+            async for completed, total, snapshot, missing in iter_character_exp_monthly(ocid, year, month):
+                if snapshot is not None:
+                    exp_history.append(snapshot)
+                if response.due():
+                    await response.update(format_monthly_progress(
+                        exp_history, year, month, completed, total))
+
         if not exp_history:
-            await loading_msg.edit(content="해당 월의 데이터가 없습니다.")
+            if missing:
+                await response.finish(content="❌ 넥슨 API 장애로 조회할 수 없고 저장된 데이터도 없습니다.")
+            else:
+                await response.finish(content="해당 월의 데이터가 없습니다.")
             return
 
-        # 일일 경험치 획득량 계산
-        daily_gains = []
-        for i in range(len(exp_history)-1):
-            today = exp_history[i]
-            yesterday = exp_history[i+1]
-
-            today_exp_rate = float(today.get('exp_rate', '0'))
-            yesterday_exp_rate = float(yesterday.get('exp_rate', '0'))
-            today_level = int(today['level'])
-            yesterday_level = int(yesterday['level'])
-
-            # 경험치 증가량 계산
-            if today_level == yesterday_level:
-                # 레벨이 같을 때: 오늘% - 어제%
-                exp_gain_rate = today_exp_rate - yesterday_exp_rate
-                exp_text = f"+{exp_gain_rate:.3f}%"
-            else:
-                # 레벨업했을 때: (100 * 레벨업 수 + 오늘%) - 어제%
-                level_diff = today_level - yesterday_level
-                exp_gain_rate = (100 * level_diff +
-                                 today_exp_rate) - yesterday_exp_rate
-                exp_text = f"{level_diff}↑\n+{exp_gain_rate:.2f}%"
-
-            daily_gains.append({
-                'date': today['date'],
-                'exp_gain_rate': max(0, exp_gain_rate),  # 음수 경험치는 0으로 처리
-                'level': today_level,
-                'is_levelup': today_level > yesterday_level,
-                'exp_text': exp_text,
-                'level_diff': level_diff if today_level > yesterday_level else 0
-            })
+        # 일일 경험치 획득량은 조회하면서 통계 엔진에 미리 계산되어 있음 (보관 기간이 지난 달은 직접 계산)
+        daily_gains = stats_engine.gains_for_month(ocid, year, month, exp_history)
+
+        # 최종 이미지 렌더링 전에 조회된 결과 먼저 표시
+        await response.update(format_monthly_progress(
+            exp_history, year, month, total, total) + "\n히트맵을 그리는 중입니다...", force=True)
 
         # 히트맵 생성
-        buf = create_monthly_heatmap(daily_gains, character_name, year, month)
+        with stage("월간", "render"):
+            buf = render_cached(create_monthly_heatmap, daily_gains, character_name, year, month)
 
         # 결과 전송
         file = discord.File(buf, filename="exp_heatmap.png")
@@ -340,16 +532,28 @@ async def 월간(ctx, character_name: str, *args):
             color=0x00ff00
         )
         embed.set_image(url="attachment://exp_heatmap.png")
-        await loading_msg.delete()
-        await ctx.send(file=file, embed=embed)
+        mark_stale(embed, *exp_history, missing=missing)
+        with stage("월간", "upload"):
+            await response.finish(embed=embed, file=file)
 
     except MapleAPIError as e:
-        await ctx.send(f"❌ 오류: {str(e)}")
+        await response.finish(content=f"❌ 오류: {str(e)}")
     except Exception as e:
-        await ctx.send("⚠️ 내부 오류가 발생했습니다")
+        await response.finish(content="⚠️ 내부 오류가 발생했습니다")
         print(f"Unexpected error: {str(e)}")
 
 
+@월간.error
+async def 월간_error(ctx, error):
+    if isinstance(error, commands.HybridCommandError):
+        error = error.original
+    if isinstance(error, (commands.BadArgument, commands.MissingRequiredArgument,
+                          app_commands.TransformerError)):
+        await ctx.send(MONTHLY_USAGE)
+    else:
+        report_command_error(ctx, error)
+
+
 def create_monthly_heatmap(daily_gains, character_name, year, month):
     """
     월간 경험치 획득량을 달력 형태의 히트맵으로 생성하는 함수
@@ -498,7 +702,7 @@ async def 썬데이메이플(ctx):
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         }
 
-        async with aiohttp.ClientSession() as session:
+        async with transport.session() as session:
             async with session.get(base_url, headers=headers) as response:
                 if response.status == 200:
                     html = await response.text()
@@ -568,17 +772,7 @@ async def 썬데이메이플_자동알림():
             print("금요일 확인됨, 알림 시작")  # 디버깅용
             for guild in bot.guilds:
                 try:
-                    # 봇의 권한 확인
                     bot_member = guild.me
-                    print(f"\n서버 '{guild.name}'에서의 봇 권한:")
-                    print(
-                        f"채널 보기: {bot_member.guild_permissions.view_channel}")
-                    print(f"메시지 보내기: {
-                          bot_member.guild_permissions.send_messages}")
-                    print(
-                        f"파일 첨부: {bot_member.guild_permissions.attach_files}")
-                    print(
-                        f"임베드 링크: {bot_member.guild_permissions.embed_links}")
 
                     category = discord.utils.find(
                         lambda c: c.name.lower() == "메이플",
@@ -592,17 +786,19 @@ async def 썬데이메이플_자동알림():
                         if channel:
                             # 채널별 권한 확인
                             channel_perms = channel.permissions_for(bot_member)
-                            print(f"\n채널 '{channel.name}'에서의 봇 권한:")
-                            print(f"메시지 보내기: {channel_perms.send_messages}")
-                            print(f"파일 첨부: {channel_perms.attach_files}")
-                            print(f"임베드 링크: {channel_perms.embed_links}")
-
                             if channel_perms.send_messages:
                                 await channel.send("📢 이번 주 썬데이메이플 정보입니다!")
                                 await 썬데이메이플(channel)
+                                metrics.inc("sunday_alerts_total", result="sent")
                             else:
-                                print(f"봇이 채널에 메시지를 보낼 권한이 없습니다.")
+                                metrics.inc("sunday_alerts_total", result="no_permission")
+                                print(f"서버 '{guild.name}'의 '{channel.name}' 채널에 메시지를 보낼 권한이 없습니다.")
+                        else:
+                            metrics.inc("sunday_alerts_total", result="no_channel")
+                    else:
+                        metrics.inc("sunday_alerts_total", result="no_channel")
                 except Exception as e:
+                    metrics.inc("sunday_alerts_total", result="error")
                     print(f"Guild {guild.name} 처리 중 오류 발생: {str(e)}")
                     continue
     except Exception as e:
@@ -615,6 +811,124 @@ async def before_썬데이메이플_자동알림():
     await bot.wait_until_ready()
 
 
+@bot.event
+async def setup_hook():
+    # 이벤트 루프 지연 측정 및 (설정된 경우) 로컬 지표 HTTP 서버 시작
+    bot.lag_monitor_task = asyncio.create_task(metrics.monitor_event_loop_lag())
+    metrics_port = os.getenv("METRICS_PORT")
+    if metrics_port:
+        await metrics.start_http_server(int(metrics_port))
+        print(f"지표 서버가 127.0.0.1:{metrics_port}/metrics 에서 시작되었습니다.")
+
+    # 슬래시 명령어(/주간, /월간, /info) 등록 (전역 등록이므로 샤드 하나만)
+    if bot.shard_id in (None, 0):
+        synced = await bot.tree.sync()
+        print(f"슬래시 명령어 {len(synced)}개가 등록되었습니다.")
+
+
+def _format_latency(hist) -> str:
+    return f"p50 {hist.quantile(0.5):.2f}s · p95 {hist.quantile(0.95):.2f}s · {hist.count}회"
+
+
+@bot.command()
+@commands.has_permissions(administrator=True)
+async def 통계(ctx):
+    """
+    봇 성능 지표를 보여줍니다 (관리자 전용)
+    """
+    embed = discord.Embed(title="봇 통계", color=0x00ff00,
+                          timestamp=discord.utils.utcnow())
+
+    # 명령어별 전체 지연 시간 + 단계별 지연 시간
+    stages = metrics.histograms("command_stage_seconds")
+    for labels, hist in sorted(metrics.histograms("command_seconds").items()):
+        command = dict(labels)['command']
+        lines = [f"전체: {_format_latency(hist)}"]
+        for stage_labels, stage_hist in sorted(stages.items()):
+            stage_labels = dict(stage_labels)
+            if stage_labels['command'] == command:
+                lines.append(f"{stage_labels['stage']}: {_format_latency(stage_hist)}")
+        embed.add_field(name=f"!{command}", value="\n".join(lines)[:1024], inline=False)
+
+    # 넥슨 API 호출 수 (엔드포인트/상태 코드별)
+    api_calls = metrics.counters("nexon_api_requests_total")
+    if api_calls:
+        lines = [f"{dict(labels)['endpoint']} [{dict(labels)['status']}]: {int(count)}회"
+                 for labels, count in sorted(api_calls.items())]
+        for labels, hist in sorted(metrics.histograms("nexon_api_request_seconds").items()):
+            lines.append(f"{dict(labels)['endpoint']} 지연: {_format_latency(hist)}")
+        embed.add_field(name="넥슨 API", value="\n".join(lines)[:1024], inline=False)
+
+    embed.add_field(name="넥슨 API 상태",
+                    value="장애 (저장된 데이터 사용 중)" if is_degraded() else "정상", inline=False)
+
+    # 캐시 적중률
+    cache_totals = {}
+    for labels, count in metrics.counters("cache_requests_total").items():
+        labels = dict(labels)
+        hits, total = cache_totals.get(labels['cache'], (0, 0))
+        cache_totals[labels['cache']] = (hits + (count if labels['result'] == 'hit' else 0), total + count)
+    if cache_totals:
+        embed.add_field(name="캐시 적중률", value="\n".join(
+            f"{cache}: {hits / total * 100:.1f}% ({int(hits)}/{int(total)})"
+            for cache, (hits, total) in sorted(cache_totals.items())), inline=False)
+
+    # 이벤트 루프 지연 및 작업 대기열
+    lag = metrics.gauges("event_loop_lag_seconds").get((), 0)
+    lag_hist = metrics.histograms("event_loop_lag_seconds_histogram").get(())
+    lag_text = f"현재 {lag * 1000:.1f}ms"
+    if lag_hist:
+        lag_text += f" · p95 {lag_hist.quantile(0.95) * 1000:.1f}ms · 최대 {lag_hist.max * 1000:.1f}ms"
+    embed.add_field(name="이벤트 루프 지연", value=lag_text, inline=False)
+
+    queue = scheduler.stats()
+    embed.add_field(name="작업 대기열",
+                    value=f"실행 중 {queue['running']} · 대기 {queue['pending']}", inline=False)
+
+    await ctx.send(embed=embed)
+
+
+@통계.error
+async def 통계_error(ctx, error):
+    if isinstance(error, commands.MissingPermissions):
+        await ctx.send("❌ 관리자만 사용할 수 있는 명령어입니다.")
+    elif isinstance(error, commands.NoPrivateMessage):
+        await ctx.send("❌ 서버에서만 사용할 수 있는 명령어입니다.")
+    else:
+        report_command_error(ctx, error)
+
+
+@bot.command()
+@commands.is_owner()
+async def 프로파일(ctx, rate: float = None):
+    """
+    명령어 프로파일링 비율을 확인하거나 변경합니다 (봇 소유자 전용)
+
+    프로세스 전체의 모든 서버 명령어에 적용되므로 서버 관리자가 아닌 봇 소유자만 바꿀 수 있습니다.
+    """
+    if rate is not None:
+        try:
+            profiler.set_sample_rate(rate)
+        except ValueError as e:
+            raise commands.BadArgument(str(e))
+
+    if profiler.sample_rate > 0:
+        await ctx.send(f"🔬 명령어의 {profiler.sample_rate * 100:g}%를 프로파일링합니다. "
+                       f"(저장 위치: {profiler.PROFILE_DIR}, 최대 {profiler.PROFILE_KEEP}개 보관)")
+    else:
+        await ctx.send("🔬 프로파일링이 꺼져 있습니다. (예: !프로파일 0.1)")
+
+
+@프로파일.error
+async def 프로파일_error(ctx, error):
+    if isinstance(error, commands.NotOwner):
+        await ctx.send("❌ 봇 소유자만 사용할 수 있는 명령어입니다.")
+    elif isinstance(error, commands.BadArgument):
+        await ctx.send("❌ 0에서 1 사이의 비율을 입력해주세요. (예: !프로파일 0.1)")
+    else:
+        report_command_error(ctx, error)
+
+
 @bot.command()
 async def 도움말(ctx):
     """
@@ -622,7 +936,8 @@ async def 도움말(ctx):
     """
     embed = discord.Embed(
         title="메이플스토리 봇 도움말",
-        description="캐릭터의 정보와 경험치를 조회하는 봇입니다.",
+        description=("캐릭터의 정보와 경험치를 조회하는 봇입니다.\n"
+                     "/주간, /월간, /info 슬래시 명령어로도 사용할 수 있습니다."),
         color=0x00ff00
     )
 
@@ -0,0 +1,168 @@
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import metrics
+
+# 만료되지 않는 항목에 쓰는 max_age
+FOREVER = float("inf")
+
+
+class MemoryCache:
+    """
+    프로세스 메모리에 저장하는 LRU 캐시
+
+    값과 저장 시각을 함께 보관하고, 조회할 때 max_age(초)로 신선도를 판단합니다.
+    max_entries를 넘으면 가장 오래 사용하지 않은 항목부터 삭제합니다 (None이면 삭제하지 않음).
+    """
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+
+    def get(self, namespace: str, key: str, max_age: float = FOREVER):
+        """
+        저장된 지 max_age 초 이내인 값 (없거나 오래됐으면 None)
+        """
+        item = self._items.get((namespace, key))
+        if item is None or time.time() - item[1] > max_age:
+            metrics.inc("cache_requests_total", cache=namespace, result="miss")
+            return None
+
+        self._items.move_to_end((namespace, key))
+        metrics.inc("cache_requests_total", cache=namespace, result="hit")
+        return item[0]
+
+    def peek(self, namespace: str, key: str):
+        """
+        저장 시각과 상관없이 저장된 값 (장애 시 오래된 데이터라도 보여줄 때 사용)
+        """
+        item = self._items.get((namespace, key))
+        return None if item is None else item[0]
+
+    @contextmanager
+    def transaction(self, write: bool = True):
+        """
+        SQLiteCache.transaction과 같은 인터페이스 (한 프로세스 안에서만 쓰므로 아무것도 하지 않음)
+        """
+        yield
+
+    def set(self, namespace: str, key: str, value):
+        self._items[(namespace, key)] = (value, time.time())
+        self._items.move_to_end((namespace, key))
+        while self.max_entries is not None and len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+
+
+class SQLiteCache:
+    """
+    여러 봇 프로세스(샤드)가 같이 쓰는 SQLite 캐시
+
+    WAL 모드라서 한 프로세스가 쓰는 동안에도 다른 프로세스가 읽을 수 있습니다.
+    값은 str 또는 bytes만 저장합니다. max_entries를 넘으면 가장 오래 전에 저장된 항목부터 삭제합니다
+    (None이면 삭제하지 않음).
+    """
+
+    # 이 횟수만큼 저장할 때마다 오래된 항목 정리
+    PRUNE_INTERVAL = 1000
+
+    def __init__(self, path: str, max_entries=200000, table: str = "cache"):
+        self.path = path
+        self.max_entries = max_entries
+        self.table = table
+        self._writes = 0
+
+        self._conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value BLOB,
+                stored_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+        """)
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_stored_at ON {table} (stored_at)")
+
+    def _select(self, namespace: str, key: str):
+        return self._conn.execute(
+            f"SELECT value, stored_at FROM {self.table} WHERE namespace = ? AND key = ?",
+            (namespace, key)).fetchone()
+
+    def get(self, namespace: str, key: str, max_age: float = FOREVER):
+        """
+        저장된 지 max_age 초 이내인 값 (없거나 오래됐으면 None)
+        """
+        row = self._select(namespace, key)
+        if row is None or time.time() - row[1] > max_age:
+            metrics.inc("cache_requests_total", cache=namespace, result="miss")
+            return None
+
+        metrics.inc("cache_requests_total", cache=namespace, result="hit")
+        return row[0]
+
+    def peek(self, namespace: str, key: str):
+        """
+        저장 시각과 상관없이 저장된 값 (장애 시 오래된 데이터라도 보여줄 때 사용)
+        """
+        row = self._select(namespace, key)
+        return None if row is None else row[0]
+
+    @contextmanager
+    def transaction(self, write: bool = True):
+        """
+        with 블록 안의 읽기/쓰기를 하나의 트랜잭션으로 묶음
+        (write면 BEGIN IMMEDIATE로 시작해서 그동안 다른 프로세스의 쓰기를 막음)
+        """
+        self._conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def set(self, namespace: str, key: str, value):
+        self._conn.execute(
+            f"INSERT OR REPLACE INTO {self.table} (namespace, key, value, stored_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, value, time.time()))
+
+        self._writes += 1
+        if self._writes % self.PRUNE_INTERVAL == 0:
+            self.prune()
+
+    def prune(self):
+        """
+        max_entries를 넘는 만큼 오래된 항목 삭제
+        """
+        if self.max_entries is None:
+            return
+        count = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE rowid IN "
+                f"(SELECT rowid FROM {self.table} ORDER BY stored_at LIMIT ?)",
+                (count - self.max_entries,))
+
+
+def create_cache(table: str, memory_entries, shared_entries):
+    """
+    CACHE_PATH가 설정되어 있으면 프로세스 간 공유 SQLite 캐시, 아니면 메모리 캐시
+    """
+    path = os.getenv("CACHE_PATH")
+    if path:
+        return SQLiteCache(path, max_entries=shared_entries, table=table)
+    return MemoryCache(max_entries=memory_entries)
+
+
+# API 응답 (OCID, 스냅샷, 캐릭터 정보)
+cache = create_cache("cache", memory_entries=10000, shared_entries=200000)
+# 렌더링된 그래프/히트맵 PNG (항목 하나가 크므로 적게 보관)
+image_cache = create_cache("images", memory_entries=100, shared_entries=2000)
+# 통계 엔진의 캐릭터별 누적 상태 (다시 계산하려면 수백 번의 API 호출이 필요하므로
+# API 응답 때문에 밀려나지 않도록 따로 보관. 공유 캐시는 삭제 없이, 메모리는 캐릭터 약 2만 명까지)
+stats_store = create_cache("stats", memory_entries=40000, shared_entries=None)
@@ -0,0 +1,99 @@
+import time
+
+import metrics
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """
+    회로가 열려 있어 요청을 보내지 않고 바로 실패할 때 발생하는 예외
+    """
+    pass
+
+
+class CircuitBreaker:
+    """
+    외부 API 장애 시 요청을 바로 실패시키는 서킷 브레이커
+
+    - closed: 정상. 연속 failure_threshold 번 실패(오류 또는 slow_call_threshold 초 이상 지연)하면 open
+    - open: reset_timeout 초 동안 모든 요청을 CircuitOpenError로 바로 실패
+    - half_open: reset_timeout 이후 half_open_max_calls 개의 시험 요청만 허용,
+      성공하면 closed, 실패하면 다시 open
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, slow_call_threshold: float = 5.0,
+                 reset_timeout: float = 30.0, half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probes = 0
+        self._set_state(CLOSED)
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            print(f"서킷 브레이커 '{self.name}': {self.state} → {state}")
+        self.state = state
+        metrics.set_gauge("circuit_breaker_state", _STATE_VALUES[state], breaker=self.name)
+
+    def before_call(self):
+        """
+        요청 전에 호출. 회로가 열려 있으면 CircuitOpenError
+        """
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                metrics.inc("circuit_breaker_rejected_total", breaker=self.name)
+                raise CircuitOpenError(f"{self.name} 장애로 잠시 요청을 보내지 않습니다")
+            self._set_state(HALF_OPEN)
+            self._probes = 0
+
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_max_calls:
+                metrics.inc("circuit_breaker_rejected_total", breaker=self.name)
+                raise CircuitOpenError(f"{self.name} 복구 확인 중입니다")
+            self._probes += 1
+
+    def record_success(self, elapsed: float):
+        """
+        요청 성공 시 호출 (응답이 느리면 실패로 취급)
+        """
+        if elapsed >= self.slow_call_threshold:
+            self.record_failure()
+            return
+        self.failures = 0
+        if self.state == HALF_OPEN:
+            self._probes = max(0, self._probes - 1)
+        self._set_state(CLOSED)
+
+    def record_failure(self):
+        """
+        요청 실패 시 호출
+        """
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._set_state(OPEN)
+
+    def record_cancel(self):
+        """
+        요청이 취소됐을 때 호출 (실패로 세지 않고 시험 요청 자리만 반환)
+        """
+        if self.state == HALF_OPEN:
+            self._probes = max(0, self._probes - 1)
+
+    @property
+    def degraded(self) -> bool:
+        """
+        정상 상태가 아닌지 여부
+        """
+        return self.state != CLOSED
@@ -2,176 +2,303 @@ from config import NEXON_API_TOKEN, NEXON_API_BASE_URL
 import aiohttp
 from datetime import datetime, timedelta
 import asyncio
+import json
+import os
+import time
 import matplotlib.pyplot as plt
 import io
+import metrics
+import transport
+from cache import cache, FOREVER
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from rate_limiter import RateLimiter
+from stats import engine as stats_engine
 
 
 class MapleAPIError(Exception):
     pass
 
 
-async def get_character_ocid(character_name: str) -> str:
+class APIUnavailableError(MapleAPIError):
     """
-    캐릭터 이름으로 OCID를 조회하는 함수
+    넥슨 API 장애로 요청을 보내지 않았고 저장된 데이터도 없을 때 발생하는 예외
     """
-    headers = {
-        "x-nxopen-api-key": NEXON_API_TOKEN
-    }
+    pass
 
-    async with aiohttp.ClientSession() as session:
-        try:
-            url = f"{NEXON_API_BASE_URL}/id?character_name={character_name}"
-            async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                if response.status == 404:
-                    raise MapleAPIError("캐릭터를 찾을 수 없습니다")
-                elif response.status != 200:
-                    error_text = await response.text()
-                    raise MapleAPIError(
-                        f"API 오류 (상태 코드: {response.status}, 응답: {error_text})")
 
-                data = await response.json()
-                return data.get('ocid')
+# 응답 캐시 유효 시간 (초). 과거 날짜 스냅샷은 바뀌지 않으므로 만료 없음 (FOREVER)
+OCID_CACHE_TTL = 24 * 60 * 60
+LATEST_CACHE_TTL = 60
 
-        except aiohttp.ClientError as e:
-            raise MapleAPIError(f"네트워크 오류: {str(e)}")
+# 연속 5번 실패하거나 5초 이상 걸리면 30초 동안 요청을 보내지 않음
+api_breaker = CircuitBreaker("nexon_api", failure_threshold=5,
+                             slow_call_threshold=5.0, reset_timeout=30.0)
 
+# 넥슨 OpenAPI 초당 호출 제한 (키 등급에 맞게 설정, 0이면 제한 없음).
+# 동시 요청 수 제한(MAX_CONCURRENT_REQUESTS)은 명령어 하나 안에서만 적용되므로
+# 여러 명령어가 동시에 실행돼도 초당 호출 수를 넘지 않도록 프로세스 전체에서 제한
+api_rate_limiter = RateLimiter("nexon_api", rate=float(os.getenv("NEXON_API_RATE_LIMIT", "5")))
 
-async def get_character_exp_history(ocid: str):
+
+async def _send(session, url: str, endpoint: str):
     """
-    캐릭터의 7일간 경험치 히스토리를 조회하는 함수
+    넥슨 API GET 요청을 보내고 (상태 코드, 응답 본문)을 반환하는 함수
+
+    모든 API 호출이 이 함수를 거치므로 초당 호출 수 제한을 여기서 적용하고,
+    호출 수/상태 코드/지연 시간과 서킷 브레이커 성공/실패를 여기서 기록합니다.
     """
     headers = {
         "x-nxopen-api-key": NEXON_API_TOKEN
     }
 
-    exp_history = []
-    today = datetime.now()
+    try:
+        api_breaker.before_call()
+    except CircuitOpenError as e:
+        raise APIUnavailableError(f"넥슨 API 장애로 잠시 조회할 수 없습니다 ({str(e)})")
 
-    # 오늘 데이터 먼저 조회 (date 파라미터 생략)
-    async with aiohttp.ClientSession() as session:
-        try:
-            url = f"{NEXON_API_BASE_URL}/character/basic?ocid={ocid}"
-            async with session.get(url, headers=headers, timeout=10) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    exp_history.append({
-                        'date': f"{today.strftime('%Y-%m-%d')}T00:00+09:00",
-                        'exp': data.get('character_exp', 0),
-                        'level': data.get('character_level', 0),
-                        'exp_rate': data.get('character_exp_rate', '0')
-                    })
-        except aiohttp.ClientError as e:
-            raise MapleAPIError(f"네트워크 오류: {str(e)}")
-
-    # 어제부터 6일 전까지의 데이터 조회
-    for i in range(1, 7):
-        date = (today - timedelta(days=i)).strftime("%Y-%m-%d")
-
-        async with aiohttp.ClientSession() as session:
-            try:
-                url = f"{
-                    NEXON_API_BASE_URL}/character/basic?ocid={ocid}&date={date}"
-                async with session.get(url, headers=headers, timeout=10) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        exp_history.append({
-                            'date': f"{date}T00:00+09:00",
-                            'exp': data.get('character_exp', 0),
-                            'level': data.get('character_level', 0),
-                            'exp_rate': data.get('character_exp_rate', '0')
-                        })
-                    elif response.status != 404:
-                        error_text = await response.text()
-                        raise MapleAPIError(
-                            f"API 오류 (상태 코드: {response.status}, 응답: {error_text})")
-
-            except aiohttp.ClientError as e:
-                raise MapleAPIError(f"네트워크 오류: {str(e)}")
+    try:
+        await api_rate_limiter.acquire()
+    except asyncio.CancelledError:
+        api_breaker.record_cancel()
+        raise
 
-    # 날짜 순으로 정렬
-    exp_history.sort(key=lambda x: x['date'])
-    return exp_history
+    status = "error"
+    start = time.perf_counter()
+    try:
+        async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as response:
+            status = response.status
+            body = await response.text()
+
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        api_breaker.record_failure()
+        raise MapleAPIError(f"네트워크 오류: {str(e) or type(e).__name__}")
+    except asyncio.CancelledError:
+        api_breaker.record_cancel()
+        raise
+    except Exception:
+        # 응답 디코딩 오류 등 예상하지 못한 오류도 실패로 기록 (half_open 시험 요청 자리 반환)
+        api_breaker.record_failure()
+        raise
+    finally:
+        metrics.inc("nexon_api_requests_total", endpoint=endpoint, status=status)
+        metrics.observe("nexon_api_request_seconds",
+                        time.perf_counter() - start, endpoint=endpoint)
+
+    if status >= 500 or status == 429:
+        api_breaker.record_failure()
+    else:
+        api_breaker.record_success(time.perf_counter() - start)
+    return status, body
 
 
-async def get_character_info(ocid: str):
+async def _request(session, url: str, endpoint: str, max_age: float = 0):
     """
-    OCID로 캐릭터 정보를 조회하는 함수
+    캐시를 거쳐 넥슨 API를 조회하고 (상태 코드, 응답 본문, 오래된 데이터 여부)를 반환하는 함수
+
+    max_age 초 이내에 저장된 200 응답이 있으면 API를 호출하지 않습니다.
+    API 장애(네트워크 오류, 5xx/429, 회로 열림) 시 저장된 응답이 있으면
+    저장 시각과 상관없이 오래된 데이터로 표시해서 반환합니다.
     """
-    headers = {
-        "x-nxopen-api-key": NEXON_API_TOKEN
-    }
+    if max_age > 0:
+        cached = cache.get("nexon_api", url, max_age)
+        if cached is not None:
+            return 200, cached, False
 
-    async with aiohttp.ClientSession() as session:
-        try:
-            url = f"{NEXON_API_BASE_URL}/character/basic?ocid={ocid}"
-            async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                if response.status == 404:
-                    raise MapleAPIError("캐릭터 정보를 찾을 수 없습니다")
-                elif response.status != 200:
-                    error_text = await response.text()
-                    raise MapleAPIError(
-                        f"API 오류 (상태 코드: {response.status}, 응답: {error_text})")
+    try:
+        status, body = await _send(session, url, endpoint)
+        if status >= 500 or status == 429:
+            raise MapleAPIError(
+                f"API 오류 (상태 코드: {status}, 응답: {body})")
+    except MapleAPIError:
+        stale = cache.peek("nexon_api", url)
+        if stale is None:
+            raise
+        metrics.inc("nexon_api_stale_responses_total", endpoint=endpoint)
+        return 200, stale, True
+
+    if status == 200:
+        cache.set("nexon_api", url, body)
+    return status, body, False
+
+
+def is_degraded() -> bool:
+    """
+    넥슨 API 장애로 저장된 데이터를 보여주고 있는지 여부
+    """
+    return api_breaker.degraded
 
-                return await response.json()
 
-        except aiohttp.ClientError as e:
-            raise MapleAPIError(f"네트워크 오류: {str(e)}")
+async def get_character_ocid(character_name: str) -> str:
+    """
+    캐릭터 이름으로 OCID를 조회하는 함수
+    """
+    async with transport.session() as session:
+        url = f"{NEXON_API_BASE_URL}/id?character_name={character_name}"
+        status, body, _ = await _request(session, url, "id", OCID_CACHE_TTL)
+        if status == 404:
+            raise MapleAPIError("캐릭터를 찾을 수 없습니다")
+        elif status != 200:
+            raise MapleAPIError(
+                f"API 오류 (상태 코드: {status}, 응답: {body})")
 
+        return json.loads(body).get('ocid')
 
-async def get_character_exp_monthly(ocid: str, year: int, month: int):
+
+# 히스토리 조회 시 명령어 하나가 동시에 보내는 API 요청 수 (초당 호출 수는 api_rate_limiter가 제한)
+MAX_CONCURRENT_REQUESTS = 5
+
+
+async def _fetch_exp_snapshot(session, semaphore, ocid: str, date):
     """
-    캐릭터의 월간 경험치 히스토리를 조회하는 함수
+    특정 날짜의 경험치 스냅샷을 조회하는 함수 (데이터가 없으면 None)
+
+    장애 중에 저장된 데이터도 없으면 APIUnavailableError
     """
-    headers = {
-        "x-nxopen-api-key": NEXON_API_TOKEN
-    }
+    # 오늘 날짜는 date 파라미터 없이 요청
+    if date == datetime.now().date():
+        url = f"{NEXON_API_BASE_URL}/character/basic?ocid={ocid}"
+        max_age = LATEST_CACHE_TTL
+    else:
+        url = f"{NEXON_API_BASE_URL}/character/basic?ocid={ocid}&date={date.strftime('%Y-%m-%d')}"
+        max_age = FOREVER
+
+    async with semaphore:
+        status, body, stale = await _request(session, url, "character/basic", max_age)
+
+    if status == 200:
+        data = json.loads(body)
+        if data.get('character_exp') is None:
+            return None
+        snapshot = {
+            'date': date.strftime("%Y-%m-%d"),
+            'exp': int(data.get('character_exp', 0)),
+            'level': int(data.get('character_level', 0)),
+            'exp_rate': float(data.get('character_exp_rate', '0'))
+        }
+        if stale:
+            snapshot['stale'] = True
+        return snapshot
+    elif status != 404:
+        raise MapleAPIError(
+            f"API 오류 (상태 코드: {status}, 응답: {body})")
+    return None
+
+
+async def iter_exp_snapshots(ocid: str, dates: list):
+    """
+    여러 날짜의 경험치 스냅샷을 동시에 조회하고 도착하는 순서대로 yield 하는 함수
 
-    exp_history = []
+    (완료된 날짜 수, 전체 날짜 수, 스냅샷, 장애로 건너뛴 날짜 수) 튜플을 yield 하며,
+    데이터가 없거나 장애로 조회하지 못한 날짜는 스냅샷이 None 입니다.
+    (장애로 건너뛴 날짜 수로 "데이터 없음"과 "조회 못 함"을 구분)
+    모든 날짜를 받으면 통계 엔진에 한 번에 반영합니다.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
 
-    # 시작일과 종료일 계산
-    start_date = datetime(year, month, 1)
+    async with transport.session() as session:
+        tasks = [asyncio.create_task(_fetch_exp_snapshot(session, semaphore, ocid, date))
+                 for date in dates]
+        try:
+            snapshots = []
+            missing = 0
+            for completed, future in enumerate(asyncio.as_completed(tasks), start=1):
+                try:
+                    snapshot = await future
+                except APIUnavailableError:
+                    # 장애 중에 저장된 데이터도 없는 날짜는 빈 날짜로 표시하고 건너뛴 수만 셈
+                    snapshot = None
+                    missing += 1
+                if snapshot is not None:
+                    snapshots.append(snapshot)
+                yield completed, len(tasks), snapshot, missing
+            stats_engine.record_snapshots(ocid, snapshots)
+        finally:
+            # 중간에 오류가 나거나 소비자가 중단하면 남은 요청 취소
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def weekly_dates() -> list:
+    """
+    오늘부터 6일 전까지의 날짜 목록
+    """
+    today = datetime.now().date()
+    return [today - timedelta(days=i) for i in range(7)]
+
+
+def monthly_dates(year: int, month: int) -> list:
+    """
+    해당 월의 날짜 목록 (미래 날짜 제외, 최신순)
+    """
+    start_date = datetime(year, month, 1).date()
     if month == 12:
-        next_month = datetime(year + 1, 1, 1)
+        next_month = datetime(year + 1, 1, 1).date()
     else:
-        next_month = datetime(year, month + 1, 1)
-    end_date = next_month - timedelta(days=1)
+        next_month = datetime(year, month + 1, 1).date()
 
-    current_date = end_date
-    while current_date >= start_date:
-        # 미래 날짜는 건너뛰기
-        if current_date > datetime.now():
-            current_date -= timedelta(days=1)
-            continue
-
-        # 오늘 날짜는 date 파라미터 없이 요청
-        if current_date.date() == datetime.now().date():
-            url = f"{NEXON_API_BASE_URL}/character/basic?ocid={ocid}"
-        else:
-            date_str = current_date.strftime("%Y-%m-%d")
-            url = f"{
-                NEXON_API_BASE_URL}/character/basic?ocid={ocid}&date={date_str}"
-
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(url, headers=headers, timeout=10) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if data.get('character_exp') is not None:
-                            exp_history.append({
-                                'date': current_date.strftime("%Y-%m-%d"),
-                                'exp': int(data.get('character_exp', 0)),
-                                'level': int(data.get('character_level', 0)),
-                                'exp_rate': float(data.get('character_exp_rate', '0'))
-                            })
-                    elif response.status != 404:
-                        error_text = await response.text()
-                        raise MapleAPIError(
-                            f"API 오류 (상태 코드: {response.status}, 응답: {error_text})")
-
-            except aiohttp.ClientError as e:
-                raise MapleAPIError(f"네트워크 오류: {str(e)}")
+    today = datetime.now().date()
+    current_date = min(next_month - timedelta(days=1), today)
 
+    dates = []
+    while current_date >= start_date:
+        dates.append(current_date)
         current_date -= timedelta(days=1)
+    return dates
+
+
+def iter_character_exp_history(ocid: str):
+    """
+    캐릭터의 7일간 경험치 스냅샷을 도착하는 순서대로 yield 하는 함수
+    """
+    return iter_exp_snapshots(ocid, weekly_dates())
+
+
+def iter_character_exp_monthly(ocid: str, year: int, month: int):
+    """
+    캐릭터의 월간 경험치 스냅샷을 도착하는 순서대로 yield 하는 함수
+    """
+    return iter_exp_snapshots(ocid, monthly_dates(year, month))
+
+
+async def get_character_exp_history(ocid: str):
+    """
+    캐릭터의 7일간 경험치 히스토리를 조회하는 함수
+    """
+    exp_history = [snapshot async for _, _, snapshot, _ in iter_character_exp_history(ocid)
+                   if snapshot is not None]
+
+    # 날짜 순으로 정렬
+    exp_history.sort(key=lambda x: x['date'])
+    return exp_history
+
+
+async def get_character_info(ocid: str):
+    """
+    OCID로 캐릭터 정보를 조회하는 함수
+    """
+    async with transport.session() as session:
+        url = f"{NEXON_API_BASE_URL}/character/basic?ocid={ocid}"
+        status, body, stale = await _request(
+            session, url, "character/basic", LATEST_CACHE_TTL)
+        if status == 404:
+            raise MapleAPIError("캐릭터 정보를 찾을 수 없습니다")
+        elif status != 200:
+            raise MapleAPIError(
+                f"API 오류 (상태 코드: {status}, 응답: {body})")
+
+        info = json.loads(body)
+        if stale:
+            info['stale'] = True
+        return info
+
+
+async def get_character_exp_monthly(ocid: str, year: int, month: int):
+    """
+    캐릭터의 월간 경험치 히스토리를 조회하는 함수
+    """
+    exp_history = [snapshot async for _, _, snapshot, _ in iter_character_exp_monthly(ocid, year, month)
+                   if snapshot is not None]
 
     # 날짜 기준 내림차순 정렬
     return sorted(exp_history, key=lambda x: x['date'], reverse=True)
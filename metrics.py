@@ -0,0 +1,175 @@
+import asyncio
+import bisect
+import time
+from contextlib import contextmanager
+
+# 지연 시간 히스토그램 구간 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_counters = {}
+_gauges = {}
+_histograms = {}
+
+
+class Histogram:
+    """
+    구간별 관측 횟수를 세는 히스토그램 (Prometheus histogram 형식)
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """
+        q 분위수의 근사값 (해당 관측이 속한 구간의 상한)
+        """
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return min(bound, self.max)
+        return self.max
+
+
+def _key(name: str, labels: dict):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def inc(name: str, value: float = 1, **labels):
+    """
+    카운터 증가
+    """
+    key = _key(name, labels)
+    _counters[key] = _counters.get(key, 0) + value
+
+
+def set_gauge(name: str, value: float, **labels):
+    """
+    게이지 값 설정
+    """
+    _gauges[_key(name, labels)] = value
+
+
+def observe(name: str, value: float, **labels):
+    """
+    히스토그램에 관측값 추가
+    """
+    key = _key(name, labels)
+    if key not in _histograms:
+        _histograms[key] = Histogram()
+    _histograms[key].observe(value)
+
+
+@contextmanager
+def timer(name: str, **labels):
+    """
+    with 블록의 실행 시간을 히스토그램에 기록
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+def counters(name: str) -> dict:
+    """
+    이름이 name인 카운터들을 {라벨 튜플: 값} 형태로 반환
+    """
+    return {labels: value for (metric, labels), value in _counters.items() if metric == name}
+
+
+def gauges(name: str) -> dict:
+    """
+    이름이 name인 게이지들을 {라벨 튜플: 값} 형태로 반환
+    """
+    return {labels: value for (metric, labels), value in _gauges.items() if metric == name}
+
+
+def histograms(name: str) -> dict:
+    """
+    이름이 name인 히스토그램들을 {라벨 튜플: Histogram} 형태로 반환
+    """
+    return {labels: hist for (metric, labels), hist in _histograms.items() if metric == name}
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ""
+    escaped = []
+    for k, v in labels:
+        v = v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped.append(f'{k}="{v}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+def render_prometheus() -> str:
+    """
+    모든 지표를 Prometheus 텍스트 형식으로 변환
+    """
+    lines = []
+
+    for metric_type, store in (('counter', _counters), ('gauge', _gauges)):
+        for name in sorted({name for name, _ in store}):
+            lines.append(f"# TYPE {name} {metric_type}")
+            for (metric, labels), value in sorted(store.items()):
+                if metric == name:
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+
+    for name in sorted({name for name, _ in _histograms}):
+        lines.append(f"# TYPE {name} histogram")
+        for (metric, labels), hist in sorted(_histograms.items(), key=lambda item: item[0]):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(hist.buckets, hist.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {hist.count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {hist.sum}")
+            lines.append(f"{name}_count{_format_labels(labels)} {hist.count}")
+
+    return "\n".join(lines) + "\n"
+
+
+async def monitor_event_loop_lag(interval: float = 1.0):
+    """
+    이벤트 루프 지연 시간 측정 (sleep이 예정보다 늦게 깨어난 만큼을 지연으로 기록)
+    """
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag = max(0.0, time.perf_counter() - start - interval)
+        set_gauge("event_loop_lag_seconds", lag)
+        observe("event_loop_lag_seconds_histogram", lag)
+
+
+async def start_http_server(port: int, host: str = "127.0.0.1"):
+    """
+    /metrics 경로로 Prometheus 텍스트를 제공하는 로컬 HTTP 서버 시작
+    """
+    from aiohttp import web
+
+    async def handle_metrics(request):
+        return web.Response(text=render_prometheus(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    return runner
@@ -0,0 +1,111 @@
+import cProfile
+import io
+import math
+import os
+import pstats
+import random
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+# 명령어 실행 중 프로파일링할 비율 (0이면 비활성화, 아래에서 PROFILE_SAMPLE_RATE로 설정)
+sample_rate = 0.0
+# 프로파일 결과를 저장할 디렉터리와 보관할 최대 개수
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))
+
+# 출력할 함수/메모리 할당 위치 개수
+TOP_FUNCTIONS = 30
+TOP_ALLOCATIONS = 20
+
+# cProfile은 동시에 하나만 켤 수 있으므로 실행 중인 프로파일이 있으면 건너뜀
+_active = False
+
+
+def set_sample_rate(rate: float):
+    """
+    프로파일링 비율 변경 (0 ~ 1 범위 밖이거나 nan/inf이면 ValueError)
+    """
+    global sample_rate
+    if not math.isfinite(rate) or not 0.0 <= rate <= 1.0:
+        raise ValueError(f"프로파일링 비율은 0에서 1 사이여야 합니다: {rate}")
+    sample_rate = rate
+
+
+set_sample_rate(float(os.getenv("PROFILE_SAMPLE_RATE", "0")))
+
+
+@contextmanager
+def profile(command: str):
+    """
+    sample_rate 확률로 with 블록을 cProfile + tracemalloc으로 측정하고 결과를 파일로 저장
+
+    비활성화 상태에서는 비율 비교만 하므로 오버헤드가 거의 없습니다.
+    asyncio에서는 같은 스레드의 다른 작업도 함께 측정되므로,
+    결과는 해당 명령어가 실행되던 동안의 프로세스 전체 모습으로 봐야 합니다.
+    """
+    global _active
+    if _active or sample_rate <= 0 or random.random() >= sample_rate:
+        yield
+        return
+
+    _active = True
+    started_tracemalloc = not tracemalloc.is_tracing()
+    if started_tracemalloc:
+        tracemalloc.start()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        if started_tracemalloc:
+            tracemalloc.stop()
+        _active = False
+        try:
+            _save(command, profiler, snapshot)
+        except OSError as e:
+            print(f"프로파일 저장 중 오류 발생: {str(e)}")
+
+
+def _save(command: str, profiler: cProfile.Profile, snapshot):
+    """
+    .prof (pstats/snakeviz용)와 .txt (상위 함수 + 메모리 할당 위치) 파일 저장
+    """
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base = os.path.join(
+        PROFILE_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}_{command}")
+
+    profiler.dump_stats(base + ".prof")
+
+    report = io.StringIO()
+    report.write(f"# {command} 누적 시간 상위 {TOP_FUNCTIONS}개 함수\n")
+    pstats.Stats(profiler, stream=report).sort_stats(
+        "cumulative").print_stats(TOP_FUNCTIONS)
+
+    report.write(f"\n# 메모리 할당 상위 {TOP_ALLOCATIONS}개 위치\n")
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+        report.write(f"{stat}\n")
+
+    with open(base + ".txt", "w", encoding="utf-8") as f:
+        f.write(report.getvalue())
+
+    _rotate()
+
+
+def _rotate():
+    """
+    오래된 프로파일부터 삭제해서 PROFILE_KEEP 개만 남김
+    """
+    runs = sorted({os.path.splitext(name)[0] for name in os.listdir(PROFILE_DIR)
+                   if name.endswith((".prof", ".txt"))})
+    for run in runs[:-max(PROFILE_KEEP, 1)]:
+        for ext in (".prof", ".txt"):
+            path = os.path.join(PROFILE_DIR, run + ext)
+            if os.path.exists(path):
+                os.remove(path)
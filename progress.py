@@ -0,0 +1,106 @@
+import time
+import weakref
+
+_responses = weakref.WeakKeyDictionary()
+
+
+def get_response(ctx) -> "CommandResponse":
+    """
+    명령어 컨텍스트에 연결된 응답 객체 (없으면 새로 생성)
+
+    스케줄러가 대기열 안내에 쓴 응답을 명령어 본문에서도 이어서 쓰기 위해 컨텍스트별로 하나만 만듭니다.
+    """
+    response = _responses.get(ctx)
+    if response is None:
+        response = _responses[ctx] = CommandResponse(ctx)
+    return response
+
+
+class CommandResponse:
+    """
+    접두사 명령어와 슬래시 명령어가 같이 쓰는 응답 처리기
+
+    - 슬래시 명령어: 바로 defer 하고, 결과는 followup 한 번으로 임베드와 이미지를 같이 보냄
+      (중간에 진행 상황을 보여줬다면 그 응답을 결과로 수정)
+    - 접두사 명령어: 로딩 메시지를 보내고, 결과는 로딩 메시지를 수정해서 보냄 (삭제 후 재전송 대신)
+
+    진행 상황 수정은 채널별 속도 제한에 걸리므로 interval 초마다 한 번만 보냅니다.
+    """
+
+    def __init__(self, ctx, interval: float = 1.5):
+        self.ctx = ctx
+        self.interval = interval
+        self.message = None
+        self._shown = False
+        self._last_edit = time.monotonic()
+        self._last_content = None
+
+    @property
+    def interaction(self):
+        return self.ctx.interaction
+
+    async def defer(self):
+        """
+        슬래시 명령어면 응답을 미룸 (3초 안에 응답해야 하므로 가장 먼저 호출)
+        """
+        if self.interaction and not self.interaction.response.is_done():
+            await self.ctx.defer()
+
+    async def start(self, content: str):
+        """
+        로딩 상태 표시 (슬래시 명령어는 defer의 '생각 중...' 표시로 대신함)
+        """
+        if self.interaction:
+            await self.defer()
+        else:
+            await self.update(content, force=True)
+
+    def due(self) -> bool:
+        """
+        지금 진행 상황을 수정해도 되는지 여부
+        """
+        return time.monotonic() - self._last_edit >= self.interval
+
+    async def update(self, content: str, force: bool = False) -> bool:
+        """
+        수정 간격이 지났으면 진행 상황 내용을 바꾸고 True를 반환
+        """
+        if content == self._last_content:
+            return False
+        if not force and not self.due():
+            return False
+
+        self._last_edit = time.monotonic()
+        self._last_content = content
+        if self.interaction:
+            await self.defer()
+            await self.interaction.edit_original_response(content=content)
+        elif self.message:
+            await self.message.edit(content=content)
+        else:
+            self.message = await self.ctx.send(content)
+        self._shown = True
+        return True
+
+    async def finish(self, content: str = None, embed=None, file=None):
+        """
+        최종 결과 전송 (내용, 임베드, 이미지를 한 번의 요청으로)
+        """
+        if self._shown:
+            attachments = [file] if file else []
+            if self.interaction:
+                await self.interaction.edit_original_response(
+                    content=content, embed=embed, attachments=attachments)
+            else:
+                await self.message.edit(content=content, embed=embed, attachments=attachments)
+            return
+
+        kwargs = {}
+        if content is not None:
+            kwargs['content'] = content
+        if embed is not None:
+            kwargs['embed'] = embed
+        if file is not None:
+            kwargs['file'] = file
+        self.message = await self.ctx.send(**kwargs)
+        self._shown = True
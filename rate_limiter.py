@@ -0,0 +1,47 @@
+import asyncio
+import time
+
+import metrics
+
+
+class RateLimiter:
+    """
+    초당 요청 수를 제한하는 토큰 버킷 (프로세스 전체에서 하나를 같이 사용)
+
+    초당 rate 개씩 토큰이 채워지고 최대 burst 개까지 모입니다.
+    토큰이 없으면 먼저 기다리기 시작한 요청부터 차례로 순서를 예약하고 기다립니다.
+    rate가 0 이하이면 제한하지 않습니다.
+    """
+
+    def __init__(self, name: str, rate: float, burst: float = None):
+        self.name = name
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1.0)
+        self.tokens = self.burst
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        """
+        토큰 하나를 쓸 수 있을 때까지 대기
+        """
+        if self.rate <= 0:
+            return
+
+        self._refill()
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return
+
+        # 토큰을 미리 빌려 순서를 예약하고, 빌린 만큼 채워질 때까지 대기
+        wait = -self.tokens / self.rate
+        metrics.observe("rate_limiter_wait_seconds", wait, limiter=self.name)
+        try:
+            await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            self.tokens += 1
+            raise
@@ -0,0 +1,154 @@
+import asyncio
+import bisect
+import itertools
+from collections import Counter
+
+# 우선순위 (숫자가 작을수록 먼저 실행)
+PRIORITY_CHEAP = 0  # 단순 정보 조회 (!info)
+PRIORITY_NORMAL = 1  # 7일 그래프 (!주간)
+PRIORITY_HEAVY = 2  # 월간 히트맵 (!월간)
+
+
+def _decrement(counter: Counter, key):
+    """
+    카운터 값을 1 줄이고 0이 되면 키를 삭제 (사용자/서버 수만큼 메모리가 늘지 않도록)
+    """
+    counter[key] -= 1
+    if counter[key] <= 0:
+        del counter[key]
+
+
+class SchedulerFullError(Exception):
+    """
+    대기열이 가득 찼거나 사용자별 작업 수 제한을 넘었을 때 발생하는 예외
+    """
+    pass
+
+
+class DuplicateJobError(Exception):
+    """
+    같은 작업이 이미 대기/실행 중일 때 발생하는 예외
+    """
+
+    def __init__(self, position: int):
+        super().__init__(f"이미 같은 작업이 있습니다 (대기 순서: {position})")
+        self.position = position
+
+
+class Job:
+    """
+    스케줄러에 등록된 작업 하나
+    """
+
+    def __init__(self, key, func, priority: int, user_id, guild_id, seq: int):
+        self.key = key
+        self.func = func
+        self.priority = priority
+        self.user_id = user_id
+        self.guild_id = guild_id
+        self.seq = seq
+        self.future = asyncio.get_running_loop().create_future()
+        self.task = None
+
+
+class JobScheduler:
+    """
+    무거운 명령어 실행을 제한하는 작업 스케줄러
+
+    - 대기열 크기 제한 (넘치면 SchedulerFullError)
+    - 우선순위가 낮은 숫자부터, 같은 우선순위는 먼저 들어온 순서대로 실행
+    - 전체/사용자별/서버별 동시 실행 수 제한 (DM은 guild_id가 None이라 서버별 제한 없음)
+    - 같은 key의 작업이 대기/실행 중이면 DuplicateJobError
+    """
+
+    def __init__(self, max_workers: int = 3, max_pending: int = 20,
+                 per_user: int = 1, per_guild: int = 2, max_user_jobs: int = 3):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.per_user = per_user
+        self.per_guild = per_guild
+        self.max_user_jobs = max_user_jobs
+
+        self._pending = []
+        self._jobs = {}
+        self._running = 0
+        self._user_running = Counter()
+        self._guild_running = Counter()
+        self._user_jobs = Counter()
+        self._seq = itertools.count()
+
+    def submit(self, key, func, priority: int = PRIORITY_NORMAL, user_id=None, guild_id=None) -> Job:
+        """
+        작업을 등록하고 Job을 반환 (결과는 job.future로 기다림)
+
+        func는 인자 없이 호출하면 코루틴을 반환하는 함수여야 합니다.
+        """
+        if key in self._jobs:
+            raise DuplicateJobError(self.position(self._jobs[key]))
+        if len(self._pending) >= self.max_pending:
+            raise SchedulerFullError("대기열이 가득 찼습니다")
+        if self._user_jobs[user_id] >= self.max_user_jobs:
+            raise SchedulerFullError("사용자별 작업 수 제한을 넘었습니다")
+
+        job = Job(key, func, priority, user_id, guild_id, next(self._seq))
+        self._jobs[key] = job
+        self._user_jobs[user_id] += 1
+        bisect.insort(self._pending, job, key=lambda j: (j.priority, j.seq))
+        self._dispatch()
+        return job
+
+    def position(self, job: Job) -> int:
+        """
+        대기열에서의 순서 (이미 실행 중이면 0)
+        """
+        try:
+            return self._pending.index(job) + 1
+        except ValueError:
+            return 0
+
+    def stats(self) -> dict:
+        """
+        현재 대기/실행 중인 작업 수
+        """
+        return {'pending': len(self._pending), 'running': self._running}
+
+    def _can_start(self, job: Job) -> bool:
+        if self._user_running[job.user_id] >= self.per_user:
+            return False
+        return job.guild_id is None or self._guild_running[job.guild_id] < self.per_guild
+
+    def _dispatch(self):
+        """
+        실행 가능한 대기 작업을 우선순위 순서대로 시작
+        """
+        for job in list(self._pending):
+            if self._running >= self.max_workers:
+                break
+            if not self._can_start(job):
+                continue
+
+            self._pending.remove(job)
+            self._running += 1
+            self._user_running[job.user_id] += 1
+            if job.guild_id is not None:
+                self._guild_running[job.guild_id] += 1
+            job.task = asyncio.create_task(self._run(job))
+
+    async def _run(self, job: Job):
+        try:
+            result = await job.func()
+        except asyncio.CancelledError:
+            job.future.cancel()
+            raise
+        except Exception as e:
+            job.future.set_exception(e)
+        else:
+            job.future.set_result(result)
+        finally:
+            self._running -= 1
+            _decrement(self._user_running, job.user_id)
+            if job.guild_id is not None:
+                _decrement(self._guild_running, job.guild_id)
+            _decrement(self._user_jobs, job.user_id)
+            del self._jobs[job.key]
+            self._dispatch()
@@ -0,0 +1,312 @@
+import json
+from datetime import date, timedelta
+
+from cache import stats_store
+
+# 캐릭터별로 보관할 최대 일수 (7/30일 합계와 레벨업 기록에 충분한 기간)
+MAX_HISTORY_DAYS = 400
+
+# 저장된 통계의 버전 (구조가 바뀌면 올려서 다시 계산하도록)
+STATE_VERSION = 1
+
+
+def calculate_daily_gain(today: dict, yesterday: dict) -> dict:
+    """
+    하루 동안의 경험치 획득량을 계산하는 함수
+
+    레벨이 같을 때: 오늘% - 어제%
+    레벨업했을 때: (100 * 레벨업 수 + 오늘%) - 어제%
+    """
+    today_exp_rate = float(today.get('exp_rate', '0'))
+    yesterday_exp_rate = float(yesterday.get('exp_rate', '0'))
+    today_level = int(today['level'])
+    yesterday_level = int(yesterday['level'])
+
+    if today_level == yesterday_level:
+        exp_gain_rate = today_exp_rate - yesterday_exp_rate
+        exp_text = f"+{exp_gain_rate:.3f}%"
+        level_diff = 0
+    else:
+        level_diff = today_level - yesterday_level
+        exp_gain_rate = (100 * level_diff + today_exp_rate) - yesterday_exp_rate
+        exp_text = f"{level_diff}↑\n+{exp_gain_rate:.2f}%"
+
+    return {
+        'date': today['date'],
+        'exp_gain_rate': max(0, exp_gain_rate),  # 음수 경험치는 0으로 처리
+        'level': today_level,
+        'is_levelup': today_level > yesterday_level,
+        'exp_text': exp_text,
+        'level_diff': max(0, level_diff)
+    }
+
+
+def calculate_daily_gains(exp_history: list) -> list:
+    """
+    날짜 내림차순으로 정렬된 경험치 히스토리로 일일 경험치 획득량을 계산하는 함수
+    """
+    return [calculate_daily_gain(exp_history[i], exp_history[i+1])
+            for i in range(len(exp_history)-1)]
+
+
+def gains_from_snapshots(snapshots: list) -> list:
+    """
+    스냅샷 목록으로 일일 획득량을 직접 계산 (바로 전날 스냅샷이 있는 날짜만, 날짜 내림차순)
+    """
+    by_date = {snapshot['date']: snapshot for snapshot in snapshots}
+    gains = []
+    for day in sorted(by_date, reverse=True):
+        previous = (date.fromisoformat(day) - timedelta(days=1)).isoformat()
+        if previous in by_date:
+            gains.append(calculate_daily_gain(by_date[day], by_date[previous]))
+    return gains
+
+
+def _cutoff(latest: str) -> str:
+    """
+    보관 기간이 끝나는 날짜 (이보다 오래된 기록은 _trim에서 삭제)
+    """
+    return (date.fromisoformat(latest) - timedelta(days=MAX_HISTORY_DAYS)).isoformat()
+
+
+def _empty_state() -> dict:
+    return {
+        'version': STATE_VERSION,
+        'history': {},  # 날짜: [레벨, 경험치%]
+        'gains': {},  # 날짜: calculate_daily_gain 결과
+        'latest': None,
+        'sum_7': 0.0,
+        'sum_30': 0.0,
+        'best_date': None,
+        'best_gain': 0.0,
+        'levelup_dates': [],
+        'streak': 0,
+        'best_streak': 0,
+        'before_latest': None
+    }
+
+
+_AGGREGATES = ('latest', 'sum_7', 'sum_30', 'best_date', 'best_gain', 'streak', 'best_streak')
+
+
+class StatsEngine:
+    """
+    캐릭터별 일일 획득량과 누적 통계를 스냅샷이 저장될 때마다 갱신하는 통계 엔진
+
+    새 날짜의 스냅샷은 직전 상태에서 O(1)로 갱신하고 (7/30일 합계는 구간에서 빠지는 날짜만 뺌),
+    같은 날짜(오늘)의 스냅샷이 바뀌면 직전 상태로 되돌린 뒤 다시 갱신합니다.
+    과거 날짜가 뒤늦게 들어오면 (월간 조회 등) 한 번에 다시 계산합니다.
+
+    일일 획득량은 바로 전날 스냅샷이 있는 날짜만 계산합니다.
+    상태는 API 응답과 분리된 stats_store(CACHE_PATH 설정 시 샤드 간 공유)에 JSON으로 저장하며,
+    summary는 날짜별 기록 없이 누적 통계만 읽습니다.
+    """
+
+    def __init__(self, store=stats_store):
+        self.store = store
+
+    def _load(self, ocid: str, with_history: bool = True) -> dict:
+        """
+        저장된 상태 읽기 (with_history가 아니면 작은 누적 통계만 읽음)
+        """
+        raw = self.store.get("stats", ocid)
+        state = json.loads(raw) if raw else None
+        if state is None or state.get('version') != STATE_VERSION:
+            return _empty_state()
+
+        if with_history:
+            raw = self.store.get("stats_history", ocid)
+            if not raw:
+                # 기록만 캐시에서 밀려난 경우 -> 처음부터 다시 계산
+                return _empty_state()
+            history = json.loads(raw)
+            if state['latest'] is not None and state['latest'] not in history['history']:
+                # 누적 통계와 기록이 서로 다른 저장에서 온 경우 -> 기록으로 다시 계산
+                return _rebuild(history['history'])
+            state['history'] = history['history']
+            state['gains'] = history['gains']
+        return state
+
+    def _save(self, ocid: str, state: dict):
+        """
+        누적 통계와 날짜별 기록을 따로 저장 (통계만 읽을 때 기록 전체를 읽지 않도록)
+        """
+        aggregates = {key: value for key, value in state.items() if key not in ('history', 'gains')}
+        history = {'history': state['history'], 'gains': state['gains']}
+        self.store.set("stats_history", ocid, json.dumps(history, ensure_ascii=False))
+        self.store.set("stats", ocid, json.dumps(aggregates, ensure_ascii=False))
+
+    def record_snapshots(self, ocid: str, snapshots: list):
+        """
+        조회한 스냅샷들을 통계에 반영
+
+        샤드끼리 같은 캐릭터를 동시에 갱신해도 누적 통계와 기록이 섞이지 않도록
+        읽기부터 저장까지 한 트랜잭션으로 처리합니다.
+        """
+        with self.store.transaction():
+            self._record(ocid, snapshots)
+
+    def _record(self, ocid: str, snapshots: list):
+        state = self._load(ocid)
+        changed = False
+        rebuild = False
+
+        for snapshot in sorted(snapshots, key=lambda x: x['date']):
+            day = snapshot['date']
+            value = [int(snapshot['level']), float(snapshot['exp_rate'])]
+            if state['history'].get(day) == value:
+                continue
+
+            changed = True
+            if rebuild or (state['latest'] is not None and day < state['latest']):
+                # 과거 날짜가 바뀜 -> 아래에서 한 번에 다시 계산
+                state['history'][day] = value
+                rebuild = True
+            elif day == state['latest']:
+                _replace_latest(state, day, value)
+            else:
+                _append(state, day, value)
+
+        if rebuild:
+            state = _rebuild(state['history'])
+        if changed:
+            _trim(state)
+            self._save(ocid, state)
+
+    def summary(self, ocid: str):
+        """
+        미리 계산된 통계 (기록이 없으면 None)
+        """
+        state = self._load(ocid, with_history=False)
+        if state['latest'] is None:
+            return None
+        return {
+            'latest': state['latest'],
+            'sum_7': state['sum_7'],
+            'sum_30': state['sum_30'],
+            'avg_7': state['sum_7'] / 7,
+            'avg_30': state['sum_30'] / 30,
+            'best_date': state['best_date'],
+            'best_gain': state['best_gain'],
+            'levelup_dates': list(state['levelup_dates']),
+            'streak': state['streak'],
+            'best_streak': state['best_streak']
+        }
+
+    def gains_for_month(self, ocid: str, year: int, month: int, snapshots: list = ()) -> list:
+        """
+        해당 월의 일일 획득량 목록 (날짜 내림차순)
+
+        보관 기간(MAX_HISTORY_DAYS)보다 오래된 달은 저장된 기록이 없으므로
+        방금 조회한 snapshots로 직접 계산합니다.
+        """
+        with self.store.transaction(write=False):
+            state = self._load(ocid)
+        if state['latest'] is None or date(year, month, 1).isoformat() < _cutoff(state['latest']):
+            return gains_from_snapshots(snapshots)
+
+        gains = state['gains']
+        prefix = f"{year}-{month:02d}-"
+        return sorted((gain for day, gain in gains.items() if day.startswith(prefix)),
+                      key=lambda x: x['date'], reverse=True)
+
+
+def _window_sum(state: dict, old_sum: float, window: int, latest, day, gain: float) -> float:
+    """
+    latest 기준 window일 합계에서 day 기준 합계로 옮기기 (구간에서 빠지는 날짜만 뺌)
+    """
+    if latest is None:
+        return gain
+    latest_date = date.fromisoformat(latest)
+    shift = (date.fromisoformat(day) - latest_date).days
+    if shift >= window:
+        return gain
+
+    for i in range(shift):
+        dropped = (latest_date - timedelta(days=window - 1 - i)).isoformat()
+        old_sum -= state['gains'].get(dropped, {}).get('exp_gain_rate', 0.0)
+    return old_sum + gain
+
+
+def _append(state: dict, day: str, value: list):
+    """
+    가장 최근보다 새로운 날짜의 스냅샷 반영 (O(1))
+    """
+    latest = state['latest']
+    state['before_latest'] = {key: state[key] for key in _AGGREGATES}
+    state['before_latest']['levelups'] = len(state['levelup_dates'])
+    state['history'][day] = value
+
+    gain = None
+    consecutive = latest is not None and (
+        date.fromisoformat(day) - date.fromisoformat(latest)).days == 1
+    if consecutive:
+        gain = calculate_daily_gain(
+            {'date': day, 'level': value[0], 'exp_rate': value[1]},
+            {'date': latest, 'level': state['history'][latest][0], 'exp_rate': state['history'][latest][1]})
+        state['gains'][day] = gain
+
+    gain_rate = gain['exp_gain_rate'] if gain else 0.0
+    state['sum_7'] = _window_sum(state, state['sum_7'], 7, latest, day, gain_rate)
+    state['sum_30'] = _window_sum(state, state['sum_30'], 30, latest, day, gain_rate)
+
+    if gain_rate > 0:
+        state['streak'] = state['streak'] + 1 if consecutive else 1
+    else:
+        state['streak'] = 0
+    state['best_streak'] = max(state['best_streak'], state['streak'])
+
+    if gain_rate > state['best_gain']:
+        state['best_gain'] = gain_rate
+        state['best_date'] = day
+    if gain and gain['is_levelup']:
+        state['levelup_dates'].append(day)
+
+    state['latest'] = day
+
+
+def _replace_latest(state: dict, day: str, value: list):
+    """
+    가장 최근 날짜(보통 오늘)의 스냅샷이 바뀌었을 때 직전 상태로 되돌린 뒤 다시 반영 (O(1))
+    """
+    before = state['before_latest']
+    if before is None:
+        state['history'][day] = value
+        return
+
+    for key in _AGGREGATES:
+        state[key] = before[key]
+    del state['levelup_dates'][before['levelups']:]
+    state['gains'].pop(day, None)
+    del state['history'][day]
+    _append(state, day, value)
+
+
+def _rebuild(history: dict) -> dict:
+    """
+    저장된 스냅샷 전체로 통계를 처음부터 다시 계산
+    """
+    state = _empty_state()
+    for day in sorted(history):
+        _append(state, day, history[day])
+    return state
+
+
+def _trim(state: dict):
+    """
+    MAX_HISTORY_DAYS보다 오래된 스냅샷과 획득량 삭제 (합계 구간보다 훨씬 길어서 통계에는 영향 없음)
+    """
+    if state['latest'] is None:
+        return
+    cutoff = _cutoff(state['latest'])
+    for key in ('history', 'gains'):
+        for day in [day for day in state[key] if day < cutoff]:
+            del state[key][day]
+    kept = [day for day in state['levelup_dates'] if day >= cutoff]
+    if state['before_latest'] is not None:
+        removed = len(state['levelup_dates']) - len(kept)
+        state['before_latest']['levelups'] = max(0, state['before_latest']['levelups'] - removed)
+    state['levelup_dates'] = kept
+
+
+engine = StatsEngine()
@@ -0,0 +1,129 @@
+"""
+여러 봇 프로세스(디스코드 샤드)를 실행하고 감시하는 실행 파일
+
+    python supervisor.py --shards 4
+
+샤드마다 bot.py를 별도 프로세스로 실행하고 SHARD_ID/SHARD_COUNT를 넘겨줍니다.
+모든 샤드는 CACHE_PATH의 SQLite 캐시를 같이 써서 같은 API 호출/렌더링을 반복하지 않습니다.
+샤드는 디스코드 게이트웨이 접속(IDENTIFY)이 겹치지 않도록 START_INTERVAL 초 간격으로 차례로 시작하고,
+프로세스가 죽으면 점점 늘어나는 대기 시간(최대 60초) 후에 다시 실행합니다.
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+
+# 어느 디렉터리에서 실행해도 bot.py와 config.py/.env를 찾도록 이 파일이 있는 디렉터리 기준으로 실행
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BOT_PATH = os.path.join(BASE_DIR, "bot.py")
+
+DEFAULT_CACHE_PATH = "cache.sqlite3"
+
+# 샤드 시작 간격 (초)
+START_INTERVAL = 5
+
+# 재시작 대기 시간 (초). 이 시간 이상 정상 실행되면 대기 시간을 처음으로 되돌림
+MIN_BACKOFF = 1
+MAX_BACKOFF = 60
+STABLE_RUNTIME = 60
+
+
+class Shard:
+    """
+    샤드 프로세스 하나의 실행 상태
+    """
+
+    def __init__(self, shard_id: int, shard_count: int, env: dict, start_at: float = 0.0):
+        self.shard_id = shard_id
+        self.env = dict(env, SHARD_ID=str(shard_id), SHARD_COUNT=str(shard_count))
+        self.process = None
+        self.started_at = 0.0
+        self.backoff = MIN_BACKOFF
+        self.restart_at = start_at
+
+    def start(self):
+        self.process = subprocess.Popen([sys.executable, BOT_PATH], env=self.env, cwd=BASE_DIR)
+        self.started_at = time.monotonic()
+        print(f"[supervisor] 샤드 {self.shard_id} 시작 (pid {self.process.pid})")
+
+    def check(self):
+        """
+        프로세스가 종료됐으면 재시작 일정을 잡고, 일정이 되면 다시 실행
+        """
+        now = time.monotonic()
+        if self.process is None:
+            if now >= self.restart_at:
+                self.start()
+            return
+
+        code = self.process.poll()
+        if code is None:
+            return
+
+        if now - self.started_at >= STABLE_RUNTIME:
+            self.backoff = MIN_BACKOFF
+        print(f"[supervisor] 샤드 {self.shard_id} 종료 (코드 {code}), {self.backoff}초 후 재시작")
+        self.process = None
+        self.restart_at = now + self.backoff
+        self.backoff = min(self.backoff * 2, MAX_BACKOFF)
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+
+    def wait(self, timeout: float):
+        if self.process is None:
+            return
+        try:
+            self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+def shard_env(shard_id: int) -> dict:
+    """
+    샤드별 환경 변수 (지표 서버 포트는 샤드마다 METRICS_PORT + 샤드 번호)
+    """
+    env = dict(os.environ)
+    env.setdefault("CACHE_PATH", DEFAULT_CACHE_PATH)
+    if env.get("METRICS_PORT"):
+        env["METRICS_PORT"] = str(int(env["METRICS_PORT"]) + shard_id)
+    return env
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="디스코드 봇 샤드 실행/감시")
+    parser.add_argument("--shards", type=int, default=int(os.getenv("SHARD_COUNT", "1")),
+                        help="실행할 샤드(프로세스) 수 (기본: SHARD_COUNT 또는 1)")
+    args = parser.parse_args(argv)
+
+    now = time.monotonic()
+    shards = [Shard(i, args.shards, shard_env(i), start_at=now + i * START_INTERVAL)
+              for i in range(args.shards)]
+
+    stopping = False
+
+    def handle_signal(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    while not stopping:
+        for shard in shards:
+            shard.check()
+        time.sleep(1)
+
+    print("[supervisor] 모든 샤드를 종료합니다.")
+    for shard in shards:
+        shard.stop()
+    for shard in shards:
+        shard.wait(timeout=10)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
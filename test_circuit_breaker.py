@@ -0,0 +1,137 @@
+"""
+서킷 브레이커 테스트
+
+    python -m unittest test_circuit_breaker
+"""
+import asyncio
+import unittest
+
+import circuit_breaker
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+
+try:
+    import main
+except ImportError:  # config.py(토큰)가 없는 환경에서는 _send 테스트를 건너뜀
+    main = None
+
+
+def open_breaker(**kwargs) -> CircuitBreaker:
+    """
+    실패 2번이면 열리고, reset_timeout이 0이라 다음 호출부터 바로 half_open이 되는 브레이커
+    """
+    breaker = CircuitBreaker("test", failure_threshold=2, slow_call_threshold=1.0,
+                             reset_timeout=0.0, **kwargs)
+    breaker.record_failure()
+    breaker.record_failure()
+    return breaker
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def test_trips_after_consecutive_failures(self):
+        breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=60.0)
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success(0.1)  # 성공하면 연속 실패 수가 초기화됨
+        breaker.record_failure()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, circuit_breaker.CLOSED)
+
+        breaker.record_failure()
+        self.assertEqual(breaker.state, circuit_breaker.OPEN)
+        self.assertTrue(breaker.degraded)
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+
+    def test_slow_calls_count_as_failures(self):
+        breaker = CircuitBreaker("test", failure_threshold=2, slow_call_threshold=1.0, reset_timeout=60.0)
+        breaker.record_success(1.5)
+        breaker.record_success(2.0)
+        self.assertEqual(breaker.state, circuit_breaker.OPEN)
+
+    def test_half_open_allows_one_probe(self):
+        breaker = open_breaker()
+        breaker.before_call()
+        self.assertEqual(breaker.state, circuit_breaker.HALF_OPEN)
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record_success(0.1)
+        self.assertEqual(breaker.state, circuit_breaker.CLOSED)
+        breaker.before_call()
+
+    def test_failed_probe_reopens_and_allows_next_probe(self):
+        breaker = open_breaker()
+        breaker.before_call()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, circuit_breaker.OPEN)
+
+        # reset_timeout이 지나면 다시 시험 요청을 보낼 수 있어야 함
+        breaker.before_call()
+        self.assertEqual(breaker.state, circuit_breaker.HALF_OPEN)
+
+    def test_cancelled_probe_is_released(self):
+        breaker = open_breaker()
+        breaker.before_call()
+        breaker.record_cancel()
+        self.assertEqual(breaker.state, circuit_breaker.HALF_OPEN)
+        breaker.before_call()
+
+
+class _Response:
+    status = 200
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def text(self):
+        raise self.error
+
+
+class _Session:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+    def get(self, url, **kwargs):
+        return _Response(self.error)
+
+
+@unittest.skipIf(main is None, "config.py가 없어 main을 불러올 수 없음")
+class SendProbeReleaseTest(unittest.TestCase):
+    """
+    half_open 시험 요청이 예상하지 못한 오류나 취소로 끝나도 자리를 반환해야 함
+    (반환하지 않으면 재시작 전까지 모든 요청이 "복구 확인 중"으로 실패)
+    """
+
+    def setUp(self):
+        self.original = main.api_breaker
+        main.api_breaker = open_breaker()
+
+    def tearDown(self):
+        main.api_breaker = self.original
+
+    def send(self, error: BaseException):
+        asyncio.run(main._send(_Session(error), "http://api/test", "test"))
+
+    def test_unexpected_error_releases_probe(self):
+        with self.assertRaises(UnicodeDecodeError):
+            self.send(UnicodeDecodeError("utf-8", b"\xff", 0, 1, "invalid start byte"))
+        self.assertEqual(main.api_breaker.state, circuit_breaker.OPEN)
+
+        main.api_breaker.before_call()
+        self.assertEqual(main.api_breaker.state, circuit_breaker.HALF_OPEN)
+
+    def test_cancel_releases_probe(self):
+        with self.assertRaises(asyncio.CancelledError):
+            self.send(asyncio.CancelledError())
+        self.assertEqual(main.api_breaker.state, circuit_breaker.HALF_OPEN)
+        main.api_breaker.before_call()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+"""
+통계 엔진 테스트
+
+    python -m unittest test_stats
+"""
+import os
+import random
+import tempfile
+import unittest
+from datetime import date, timedelta
+
+import stats
+from cache import MemoryCache, SQLiteCache
+
+AGGREGATES = ('latest', 'sum_7', 'sum_30', 'best_gain', 'streak', 'best_streak', 'levelup_dates')
+
+
+def snapshot(day: date, level: int, exp_rate: float) -> dict:
+    return {'date': day.isoformat(), 'level': level, 'exp_rate': exp_rate, 'exp': 0}
+
+
+class IncrementalStatsTest(unittest.TestCase):
+    def assert_matches_rebuild(self, engine: stats.StatsEngine, truth: dict):
+        state = engine._load("o")
+        expected = stats._rebuild(truth)
+        stats._trim(expected)
+        for key in AGGREGATES:
+            if isinstance(expected[key], float):
+                self.assertAlmostEqual(state[key], expected[key], places=6, msg=key)
+            else:
+                self.assertEqual(state[key], expected[key], msg=key)
+        self.assertEqual(state['gains'].keys(), expected['gains'].keys())
+
+    def test_random_updates_match_rebuild(self):
+        """
+        새 날짜 추가 / 오늘 스냅샷 변경 / 과거 날짜 추가를 섞어도 처음부터 다시 계산한 결과와 같아야 함
+        """
+        rng = random.Random(1)
+        start = date(2024, 1, 1)
+        for trial in range(200):
+            engine = stats.StatsEngine(MemoryCache())
+            truth = {}
+            level, rate = 200, 0.0
+            for _ in range(rng.randint(1, 60)):
+                op = rng.random()
+                latest = max(map(date.fromisoformat, truth)) if truth else start
+                if op < 0.6:
+                    day = latest + timedelta(days=rng.choice([1, 1, 1, 2, 9]))
+                elif op < 0.8 and truth:
+                    day = latest
+                else:
+                    day = start + timedelta(days=rng.randint(-20, 40))
+
+                rate += rng.random() * 30
+                if rate >= 100:
+                    level += int(rate // 100)
+                    rate %= 100
+                item = snapshot(day, level, round(rate, 3))
+                truth[item['date']] = [level, item['exp_rate']]
+                engine.record_snapshots("o", [item])
+
+            with self.subTest(trial=trial):
+                self.assert_matches_rebuild(engine, truth)
+
+    def test_trim_keeps_levelup_revert_consistent(self):
+        """
+        오래된 기록이 삭제된 뒤에 오늘 스냅샷이 바뀌어도 레벨업 기록이 맞아야 함
+        """
+        engine = stats.StatsEngine(MemoryCache())
+        start = date(2024, 1, 1)
+        truth = {}
+        for i in range(stats.MAX_HISTORY_DAYS + 30):
+            item = snapshot(start + timedelta(days=i), 200 + i // 10, float(i % 10) * 10)
+            truth[item['date']] = [item['level'], item['exp_rate']]
+            engine.record_snapshots("o", [item])
+
+        item = snapshot(start + timedelta(days=stats.MAX_HISTORY_DAYS + 29), 300, 1.0)
+        truth[item['date']] = [300, 1.0]
+        engine.record_snapshots("o", [item])
+        self.assert_matches_rebuild(engine, truth)
+
+
+class GainsForMonthTest(unittest.TestCase):
+    def test_month_outside_retention_uses_snapshots(self):
+        """
+        보관 기간보다 오래된 달도 방금 조회한 스냅샷으로 획득량을 계산해야 함
+        """
+        engine = stats.StatsEngine(MemoryCache())
+        engine.record_snapshots("o", [snapshot(date(2026, 10, 19), 280, 10.0)])
+
+        march = [snapshot(date(2024, 3, 1) + timedelta(days=i), 250, i * 2.0) for i in range(31)]
+        engine.record_snapshots("o", march)
+
+        gains = engine.gains_for_month("o", 2024, 3, march)
+        self.assertEqual(len(gains), 30)
+        self.assertEqual(gains[0]['date'], "2024-03-31")
+        self.assertAlmostEqual(gains[0]['exp_gain_rate'], 2.0)
+
+    def test_month_inside_retention_uses_stored_gains(self):
+        engine = stats.StatsEngine(MemoryCache())
+        days = [snapshot(date(2024, 3, 1) + timedelta(days=i), 250, i * 2.0) for i in range(31)]
+        engine.record_snapshots("o", days)
+        self.assertEqual(len(engine.gains_for_month("o", 2024, 3)), 30)
+
+    def test_gains_only_between_consecutive_days(self):
+        days = [snapshot(date(2024, 3, day), 250, day * 1.0) for day in (1, 2, 4, 5)]
+        gains = stats.gains_from_snapshots(days)
+        self.assertEqual([gain['date'] for gain in gains], ["2024-03-05", "2024-03-02"])
+
+
+class SharedStoreTest(unittest.TestCase):
+    """
+    여러 샤드가 같은 SQLite 파일을 쓰는 경우
+    """
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "stats.sqlite3")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_interleaved_shards_match_rebuild(self):
+        engines = [stats.StatsEngine(SQLiteCache(self.path, max_entries=None, table="stats"))
+                   for _ in range(2)]
+        rng = random.Random(2)
+        truth = {}
+        day, level, rate = date(2024, 1, 1), 250, 0.0
+        for i in range(60):
+            if rng.random() < 0.7:
+                day += timedelta(days=1)
+            rate = (rate + rng.random() * 20) % 100
+            item = snapshot(day, level, round(rate, 3))
+            truth[item['date']] = [level, item['exp_rate']]
+            engines[i % 2].record_snapshots("o", [item])
+
+        state = engines[0]._load("o")
+        expected = stats._rebuild(truth)
+        self.assertEqual(state['latest'], expected['latest'])
+        self.assertAlmostEqual(state['sum_30'], expected['sum_30'], places=6)
+        self.assertEqual(state['gains'].keys(), expected['gains'].keys())
+
+    def test_failed_update_rolls_back(self):
+        store = SQLiteCache(self.path, max_entries=None, table="stats")
+        engine = stats.StatsEngine(store)
+        engine.record_snapshots("o", [snapshot(date(2024, 3, 1), 250, 1.0)])
+        with self.assertRaises(KeyError):
+            engine.record_snapshots("o", [{'date': "2024-03-02", 'exp_rate': 2.0}])
+        self.assertEqual(engine.summary("o")['latest'], "2024-03-01")
+        # 롤백 후에도 다음 갱신이 가능해야 함
+        engine.record_snapshots("o", [snapshot(date(2024, 3, 2), 250, 2.0)])
+        self.assertEqual(engine.summary("o")['latest'], "2024-03-02")
+
+    def test_mismatched_aggregates_are_rebuilt(self):
+        """
+        누적 통계의 latest가 기록에 없으면 (서로 다른 저장이 섞인 경우) 기록으로 다시 계산해야 함
+        """
+        engine = stats.StatsEngine(MemoryCache())
+        engine.record_snapshots("o", [snapshot(date(2024, 3, 1), 250, 1.0),
+                                      snapshot(date(2024, 3, 2), 250, 2.0)])
+        old_history = engine.store.peek("stats_history", "o")
+        engine.record_snapshots("o", [snapshot(date(2024, 3, 3), 250, 4.0)])
+        engine.store.set("stats_history", "o", old_history)
+
+        engine.record_snapshots("o", [snapshot(date(2024, 3, 3), 250, 5.0)])
+        self.assertEqual(engine.summary("o")['latest'], "2024-03-03")
+        self.assertAlmostEqual(engine.summary("o")['sum_7'], 4.0)
+
+
+class StatsStoreTest(unittest.TestCase):
+    def test_api_cache_churn_does_not_evict_stats(self):
+        """
+        통계 상태는 API 응답 캐시가 아닌 별도 저장소에 있어 API 응답이 많아도 지워지지 않아야 함
+        """
+        from cache import cache, stats_store
+        self.assertIsNot(stats_store, cache)
+        if isinstance(stats_store, MemoryCache):
+            self.assertIsNotNone(stats_store.max_entries)  # 메모리 저장소는 LRU 크기 제한이 있어야 함
+
+        engine = stats.StatsEngine()
+        engine.record_snapshots("churn-test", [snapshot(date(2024, 3, 1), 250, 1.0),
+                                               snapshot(date(2024, 3, 2), 250, 3.0)])
+        for i in range(12000):
+            cache.set("nexon_api", f"churn-{i}", "{}")
+        self.assertIsNotNone(engine.summary("churn-test"))
+        self.assertEqual(len(engine.gains_for_month("churn-test", 2024, 3)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
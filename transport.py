@@ -0,0 +1,262 @@
+"""
+넥슨 API와 이벤트 페이지 요청을 녹화/재생하는 HTTP 전송 계층
+
+    TRANSPORT_MODE=record CASSETTE=느린조회 python bot.py   # 실제 응답과 걸린 시간을 녹화
+    TRANSPORT_MODE=replay CASSETTE=느린조회 python bot.py   # 네트워크 없이 녹화된 응답으로 실행
+    python transport.py 느린조회                             # 녹화 내용 확인
+
+- live (기본): aiohttp.ClientSession 그대로 사용
+- record: 실제로 요청하고 (URL, 상태 코드, 본문, 걸린 시간)을 카세트 파일에 추가
+- replay: 네트워크 없이 카세트의 응답을 녹화된 시간 / REPLAY_SPEED 만큼 기다렸다가 반환
+  (REPLAY_SPEED=0이면 기다리지 않음)
+
+카세트는 CASSETTE_DIR/<이름>.jsonl.gz 에 요청 하나당 JSON 한 줄로 gzip 압축해서 저장합니다.
+요청 헤더(API 키)는 저장하지 않습니다. 같은 URL을 여러 번 녹화했으면 녹화된 순서대로 재생하고,
+다 쓰면 마지막 응답을 반복합니다.
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+import aiohttp
+
+import metrics
+
+LIVE = "live"
+RECORD = "record"
+REPLAY = "replay"
+
+mode = os.getenv("TRANSPORT_MODE", LIVE)
+CASSETTE_DIR = os.getenv("CASSETTE_DIR", "cassettes")
+cassette_name = os.getenv("CASSETTE", "default")
+# 재생 속도 배율 (1이면 녹화된 속도, 10이면 10배 빠르게, 0이면 바로 응답)
+replay_speed = float(os.getenv("REPLAY_SPEED", "1"))
+
+if mode not in (LIVE, RECORD, REPLAY):
+    raise SystemExit(f"[transport] 알 수 없는 TRANSPORT_MODE: {mode} ({LIVE}/{RECORD}/{REPLAY} 중 하나)")
+
+
+class CassetteMissError(aiohttp.ClientError):
+    """
+    재생 모드에서 카세트에 녹화되지 않은 요청을 보냈을 때 발생하는 예외
+    (네트워크 오류와 같은 경로로 처리되도록 aiohttp.ClientError를 상속)
+    """
+    pass
+
+
+def cassette_path(name: str = None) -> str:
+    return os.path.join(CASSETTE_DIR, f"{name or cassette_name}.jsonl.gz")
+
+
+def load_cassette(path: str) -> list:
+    """
+    카세트 파일의 녹화 항목 목록 (녹화된 순서)
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def session():
+    """
+    현재 전송 방식의 세션 (aiohttp.ClientSession처럼 async with / get으로 사용)
+    """
+    if mode == RECORD:
+        return _RecordingSession(cassette_path())
+    if mode == REPLAY:
+        return _ReplaySession(_replay)
+    return aiohttp.ClientSession()
+
+
+class _Response:
+    """
+    녹화/재생 세션이 돌려주는 응답 (status와 text()만 제공)
+    """
+
+    def __init__(self, status: int, body: str):
+        self.status = status
+        self._body = body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def text(self):
+        return self._body
+
+
+class _RecordingSession:
+    """
+    실제 aiohttp 세션으로 요청하고 응답을 카세트에 녹화하는 세션
+
+    세션 안에서는 메모리에 모아뒀다가 세션이 끝날 때 gzip 멤버 하나로 이어 씁니다.
+    (동시에 열린 여러 세션이 같은 파일에 섞여 쓰지 않도록 한 번에 씀)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._session = aiohttp.ClientSession()
+        self._entries = []
+
+    async def __aenter__(self):
+        await self._session.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc):
+        try:
+            await self._session.__aexit__(*exc)
+        finally:
+            self._flush()
+        return False
+
+    def get(self, url: str, **kwargs):
+        return _RecordedRequest(self, url, kwargs)
+
+    def _flush(self):
+        if not self._entries:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with gzip.open(self.path, "at", encoding="utf-8") as f:
+            for entry in self._entries:
+                f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._entries = []
+
+
+class _RecordedRequest:
+    """
+    _RecordingSession.get()이 돌려주는 async with 대상 (본문까지 읽은 뒤 녹화)
+    """
+
+    def __init__(self, recorder: _RecordingSession, url: str, kwargs: dict):
+        self.recorder = recorder
+        self.url = url
+        self.kwargs = kwargs
+
+    async def __aenter__(self):
+        start = time.perf_counter()
+        async with self.recorder._session.get(self.url, **self.kwargs) as response:
+            status = response.status
+            body = await response.text()
+        self.recorder._entries.append({
+            'method': 'GET',
+            'url': self.url,
+            'status': status,
+            'elapsed': round(time.perf_counter() - start, 4),
+            'body': body
+        })
+        metrics.inc("transport_recorded_total")
+        return _Response(status, body)
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _Replay:
+    """
+    카세트에서 읽은 URL별 응답 목록과 재생 위치
+    """
+
+    def __init__(self, entries: list):
+        self.responses = defaultdict(list)
+        for entry in entries:
+            self.responses[(entry['method'], entry['url'])].append(entry)
+        self.positions = defaultdict(int)
+
+    def next(self, method: str, url: str):
+        responses = self.responses.get((method, url))
+        if not responses:
+            return None
+        position = self.positions[(method, url)]
+        self.positions[(method, url)] = position + 1
+        return responses[min(position, len(responses) - 1)]
+
+
+def _load_replay() -> _Replay:
+    """
+    재생 모드로 시작할 때 카세트를 한 번 읽음
+    (파일이 없으면 명령어마다 내부 오류가 나지 않도록 시작할 때 바로 종료)
+    """
+    path = cassette_path()
+    if not os.path.exists(path):
+        raise SystemExit(f"[transport] 재생할 카세트 파일이 없습니다: {path} "
+                         f"(TRANSPORT_MODE={RECORD}로 먼저 녹화하세요)")
+    replay = _Replay(load_cassette(path))
+    print(f"[transport] 카세트 재생: {path} (요청 {sum(map(len, replay.responses.values()))}개, "
+          f"속도 x{replay_speed:g})")
+    return replay
+
+
+_replay = _load_replay() if mode == REPLAY else None
+
+
+class _ReplaySession:
+    """
+    네트워크 없이 카세트의 응답을 돌려주는 세션
+    """
+
+    def __init__(self, replay: _Replay):
+        self.replay = replay
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def get(self, url: str, **kwargs):
+        return _ReplayedRequest(self.replay, url)
+
+
+class _ReplayedRequest:
+    """
+    _ReplaySession.get()이 돌려주는 async with 대상 (녹화된 시간만큼 기다린 뒤 응답)
+    """
+
+    def __init__(self, replay: _Replay, url: str):
+        self.replay = replay
+        self.url = url
+
+    async def __aenter__(self):
+        entry = self.replay.next('GET', self.url)
+        if entry is None:
+            metrics.inc("transport_replayed_total", result="miss")
+            raise CassetteMissError(f"카세트에 녹화되지 않은 요청입니다: {self.url}")
+
+        metrics.inc("transport_replayed_total", result="hit")
+        if replay_speed > 0:
+            await asyncio.sleep(entry['elapsed'] / replay_speed)
+        return _Response(entry['status'], entry['body'])
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="녹화된 카세트 내용 확인")
+    parser.add_argument("cassette", nargs="?", default=cassette_name,
+                        help="카세트 이름 또는 파일 경로 (기본: CASSETTE 또는 default)")
+    args = parser.parse_args(argv)
+
+    path = args.cassette if os.path.exists(args.cassette) else cassette_path(args.cassette)
+    if not os.path.exists(path):
+        print(f"카세트 파일이 없습니다: {path}")
+        return 1
+
+    entries = load_cassette(path)
+    for entry in entries:
+        print(f"{entry['status']:>4}  {entry['elapsed'] * 1000:>8.1f}ms  "
+              f"{len(entry['body']):>8}B  {entry['method']} {entry['url']}")
+    total = sum(entry['elapsed'] for entry in entries)
+    print(f"\n{path}: 요청 {len(entries)}개, 녹화된 시간 합계 {total:.2f}초, "
+          f"파일 크기 {os.path.getsize(path) / 1024:.1f}KB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())